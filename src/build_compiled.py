@@ -0,0 +1,64 @@
+"""
+Build script compiling the core of the sudoku package with Cython.
+
+The modules listed in sudoku.CORE_MODULES are compiled from their unchanged
+Python sources into extension modules placed beside them, which Python then
+imports in their place (check sudoku.COMPILED). Cython and a C compiler are
+only needed to build; without the extensions the package runs as pure
+Python. Rebuild after changing a core module, as the extension is imported
+instead of the newer source, or remove the extensions with --clean.
+
+Usage (from the src folder):
+    python build_compiled.py [--clean]
+"""
+import glob
+import os
+import sys
+
+from sudoku import CORE_MODULES
+
+SOURCES = [os.path.join("sudoku", module + ".py") for module in CORE_MODULES]
+""" List[str]:  The source files compiled, relative to the src folder.
+"""
+
+
+def clean():
+    """
+    Function to remove the extensions and generated C files of a build.
+    """
+    for source in SOURCES:
+        stem = source[:-len(".py")]
+        for path in glob.glob(stem + ".*.so") + glob.glob(stem + ".*.pyd") \
+                + glob.glob(stem + ".c"):
+            os.remove(path)
+
+
+def build():
+    """
+    Function to compile every core module in place.
+    """
+    from Cython.Build import cythonize
+    from setuptools import setup
+
+    setup(name="sudoku-compiled",
+          ext_modules=cythonize(SOURCES, compiler_directives={
+              "language_level": 3,
+              # The annotations document types, they do not declare C types
+              "annotation_typing": False}),
+          script_args=["build_ext", "--inplace"])
+
+
+def main():
+    """
+    Function to run if this script is executed - builds the extensions, or
+    removes them if --clean is given.
+    """
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    if "--clean" in sys.argv[1:]:
+        clean()
+    else:
+        build()
+
+
+if __name__ == "__main__":
+    main()
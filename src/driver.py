@@ -1,6 +1,9 @@
+import threading
+import time
 import tkinter as tk
 import tkinter.ttk as ttk
 from tkinter import messagebox
+from sudoku.stats import SolveStats
 from sudoku.sudoku import Sudoku
 
 SUDOKU = [[], [], [], [], [], [], [], [], []]
@@ -10,20 +13,130 @@ SUDOKU = [[], [], [], [], [], [], [], [], []]
 WINDOW = tk.Tk()
 """ Tk: Tkinter GUI window.
 """
+STATUS = tk.StringVar(WINDOW)
+""" StringVar: The progress of the current solve, shown below the buttons.
+"""
+CANCEL_BUTTON = None
+""" Button: The button cancelling the current solve (disabled when idle).
+"""
+WORKER = None
+""" SolveWorker: The thread solving the sudoku (None if no solve has been
+                 started).
+"""
+GUESSES_PER_STEP = 200
+""" int:    The number of guesses the worker makes between checks for being
+            cancelled.
+"""
+POLL_MS = 100
+""" int:    The number of milliseconds between progress updates.
+"""
+
+
+class SolveWorker(threading.Thread):
+    """
+    SolveWorker object used to solve a sudoku away from the GUI thread.
+
+    The sudoku is solved a few guesses at a time (see Sudoku.solve_steps())
+    so a cancel request is noticed quickly. The worker never touches a
+    widget - the GUI thread reads its progress with WINDOW.after() instead,
+    as tkinter must only be used from the thread running the main loop.
+
+    Attributes:
+        _sudoku (Sudoku):   The sudoku being solved
+        _stats (SolveStats):    The statistics of the solve, read for progress
+        _cancelled (threading.Event):   Set to stop the solve early
+        _result (bool): True = solved, False = no solution, None = not
+                        finished or cancelled
+        _start (float): The time.perf_counter() value the solve started at
+    """
+    _sudoku = None
+    _stats = None
+    _cancelled = None
+    _result = None
+    _start = 0.0
+
+    def __init__(self, sudoku: Sudoku):
+        """
+        Constructor for an instance of a SolveWorker, ready to be started.
+        @param sudoku:  The sudoku to solve
+        @type sudoku:   Sudoku
+        """
+        super().__init__(daemon=True)
+        self._sudoku = sudoku
+        self._stats = SolveStats()
+        self._cancelled = threading.Event()
+        self._result = None
+        self._start = time.perf_counter()
+
+    def run(self):
+        """
+        Operation run on the worker thread - solves until finished or
+        cancelled.
+        """
+        self._start = time.perf_counter()
+        while not self._cancelled.is_set():
+            result = self._sudoku.solve_steps(GUESSES_PER_STEP, self._stats)
+            if result is not None:
+                self._result = result
+                return
+
+    def cancel(self):
+        """
+        Operation to ask the solve to stop at its next check.
+        """
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        """
+        Getter for whether the solve was asked to stop.
+        @return:    True = cancelled, False = not cancelled
+        @rtype:     bool
+        """
+        return self._cancelled.is_set()
+
+    def get_result(self) -> bool:
+        """
+        Getter for the result of the solve.
+        @return:    True = solved, False = no solution, None = not finished
+                    or cancelled
+        @rtype:     bool
+        """
+        return self._result
+
+    def get_sudoku(self) -> Sudoku:
+        """
+        Getter for the sudoku being solved.
+        @return:    The sudoku
+        @rtype:     Sudoku
+        """
+        return self._sudoku
+
+    def get_progress(self) -> str:
+        """
+        Getter for a description of the progress made so far.
+        @return:    The current guess depth and the guesses made per second
+        @rtype:     str
+        """
+        elapsed = time.perf_counter() - self._start
+        rate = self._stats.guesses / elapsed if elapsed > 0 else 0.0
+        return "Solving... depth %d, %.0f nodes/s" % (self._stats.depth,
+                                                     rate)
 
 
 def update_gui(sudoku: Sudoku):
     """
     Operation to update the GUI to the state given as a parameter.
+
+    Only the cells whose value has changed are redrawn.
     @param sudoku:  The sudoku states to change the GUI to
     @type sudoku:   Sudoku
     """
+    rows = sudoku.to_rows()
     for i in range(0, 9, 1):
         for j in range(0, 9, 1):
-            try:
-                SUDOKU[i][j].current(sudoku.get_box(i, j).get_value())
-            except tk.TclError:
-                SUDOKU[i][j].current(0)
+            value = rows[j][i]
+            if SUDOKU[i][j].get() != (str(value) if value else ""):
+                SUDOKU[i][j].current(value)
 
 
 def validate_inputs() -> bool:
@@ -57,39 +170,88 @@ def solve():
     """
     Operation to attempt to solve the sudoku puzzle that the GUI represents.
 
-    If there are any error within the sudoku or the puzzle cannot be solved an
-    alert pops up, otherwise the GUI is updated with the solved sudoku puzzle.
+    If there are any error within the sudoku an alert pops up, otherwise the
+    puzzle is solved by a background thread (see SolveWorker) while the GUI
+    stays responsive, showing its progress until it finishes (see
+    check_worker()).
     """
+    global WORKER
+    if WORKER is not None and WORKER.is_alive():
+        return
     # Converts GUI puzzle to Sudoku instance
     if validate_inputs():
         sudoku = Sudoku(SUDOKU)
-        if sudoku.is_valid():
-            if sudoku.solve():
-                update_gui(sudoku)
-            else:
-                messagebox.showerror(title="Error", message="Cannot solve.")
-                update_gui(sudoku)
+        conflicts = sudoku.find_conflicts()
+        if not conflicts:
+            WORKER = SolveWorker(sudoku)
+            WORKER.start()
+            CANCEL_BUTTON["state"] = tk.NORMAL
+            STATUS.set("Solving...")
+            WINDOW.after(POLL_MS, check_worker)
         else:
+            lines = []
+            for conflict in conflicts:
+                lines.append("The value " + str(conflict.get_value())
+                             + " is repeated in a " + conflict.get_kind()
+                             + " at coordinates " + ", ".join(
+                                 str(coordinates) for coordinates
+                                 in conflict.get_coordinates()) + ".")
             messagebox.showerror(title="Error",
-                                 message="This sudoku is invalid.")
+                                 message="This sudoku is invalid.\n"
+                                         + "\n".join(lines))
+
+
+def check_worker():
+    """
+    Operation run on the GUI thread to show the progress of the background
+    solve, rescheduling itself until the solve finishes.
+
+    If the puzzle cannot be solved an alert pops up, otherwise the GUI is
+    updated with the solved sudoku puzzle.
+    """
+    worker = WORKER
+    if worker.is_alive():
+        STATUS.set(worker.get_progress())
+        WINDOW.after(POLL_MS, check_worker)
+        return
+    CANCEL_BUTTON["state"] = tk.DISABLED
+    if worker.is_cancelled():
+        STATUS.set("Cancelled.")
+    elif worker.get_result():
+        STATUS.set("Solved.")
+        update_gui(worker.get_sudoku())
+    else:
+        STATUS.set("")
+        messagebox.showerror(title="Error", message="Cannot solve.")
+        update_gui(worker.get_sudoku())
+
+
+def cancel():
+    """
+    Operation to stop the background solve, leaving the GUI as it is.
+    """
+    if WORKER is not None:
+        WORKER.cancel()
 
 
 def clear():
     """
     Operation to clear the GUI sudoku puzzle of all it's current values.
 
-    A blank sudoku puzzle remains.
+    Any solve in progress is cancelled and a blank sudoku puzzle remains.
     """
+    cancel()
     for i in range(0, 9, 1):
         for j in range(0, 9, 1):
-            SUDOKU[i][j].current(0)
+            if SUDOKU[i][j].get() != "":
+                SUDOKU[i][j].current(0)
 
 
 def load_gui():
     """
     Operation to set up and run the tkinter GUI.
     """
-    height = 538
+    height = 580
     width = 441
     global WINDOW
     style = ttk.Style()
@@ -99,7 +261,7 @@ def load_gui():
     WINDOW.geometry("%sx%s" % (width, height))
     WINDOW.resizable(False, False)
     WINDOW.title("Soduko Solver")
-    global SUDOKU
+    global SUDOKU, CANCEL_BUTTON
     for i in range(0, 9, 1):
         for j in range(0, 9, 1):
             # Creates input box with coordinates (i, j)
@@ -136,6 +298,12 @@ def load_gui():
               font="Verdana 16 bold", command=clear).grid(column=0, row=14,
                                                           columnspan=6,
                                                           sticky="we")
+    tk.Label(WINDOW, textvariable=STATUS,
+             font="Verdana 10").grid(column=0, row=15, columnspan=9,
+                                     sticky="w")
+    CANCEL_BUTTON = tk.Button(WINDOW, text="Cancel", font="Verdana 10",
+                              command=cancel, state=tk.DISABLED)
+    CANCEL_BUTTON.grid(column=9, row=15, columnspan=4, sticky="we")
     WINDOW.mainloop()
 
 
@@ -1 +1,48 @@
+"""
+Sudoku solving package.
 
+The core modules (see CORE_MODULES) are plain Python, but can be compiled
+into extension modules with Cython by running build_compiled.py from the
+src folder. A compiled module is imported in place of its source whenever it
+has been built, and the source is used otherwise, so nothing else changes.
+COMPILED tells which is in use.
+"""
+from importlib.machinery import EXTENSION_SUFFIXES
+from importlib.util import find_spec
+
+CORE_MODULES = ("bitmask", "layout", "propagation", "strategies",
+                "backtrack", "dlx", "box", "sudoku")
+""" Tuple[str]: The modules of this package that can be compiled, the ones
+                every solve spends its time in.
+"""
+
+
+def _is_compiled(module: str) -> bool:
+    """
+    Function to check whether a module of this package will be imported from
+    a compiled extension, without importing it.
+    @param module:  The name of the module within this package
+    @type module:   str
+    @return:    True = the compiled extension is used, False = the Python
+                source is used
+    @rtype:     bool
+    """
+    spec = find_spec(__name__ + "." + module)
+    return spec is not None and spec.origin is not None \
+        and spec.origin.endswith(tuple(EXTENSION_SUFFIXES))
+
+
+COMPILED = all(_is_compiled(module) for module in CORE_MODULES)
+""" bool:   True = every core module is running compiled, False = the pure
+            Python sources are in use (some modules may still be compiled,
+            see compiled_modules()).
+"""
+
+
+def compiled_modules() -> ():
+    """
+    Function to list the core modules imported from compiled extensions.
+    @return:    The names of the compiled modules
+    @rtype:     Tuple[str]
+    """
+    return tuple(module for module in CORE_MODULES if _is_compiled(module))
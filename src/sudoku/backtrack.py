@@ -0,0 +1,313 @@
+"""
+In place backtracking search over a flat, row-major list of option masks.
+
+Rather than cloning the sudoku for every guess, the search changes one list
+of masks and records every change on an undo trail (see
+sudoku.propagation). When a guess fails the masks are rolled back to the mark
+saved before it, so the memory used never grows past one sudoku plus one
+trail entry per elimination on the current path.
+
+A search can be given a deadline (a time.monotonic() value), checked before
+every guess, so a runaway search is abandoned by raising SolveTimeout. It
+can also be given a cancel flag (any object with an is_set() method, such
+as a threading.Event), checked at the same point, so another thread or
+process can stop it early by setting the flag, raising SolveCancelled.
+
+The path of guesses is kept on an explicit stack rather than the call stack
+(see Search), so a search is never limited by Python's recursion limit and
+can be paused after a number of guesses and resumed later.
+"""
+import time
+
+from sudoku.bitmask import lowest_bit, popcount
+from sudoku.propagation import assign, undo
+from sudoku.stats import SolveStats
+from sudoku.strategies import apply
+
+
+class SolveTimeout(Exception):
+    """
+    SolveTimeout exception raised when a search runs past its deadline.
+    """
+
+
+class SolveCancelled(Exception):
+    """
+    SolveCancelled exception raised when a search finds its cancel flag set.
+    """
+
+
+def fewest_options(cells: []) -> int:
+    """
+    Function to find the unsolved cell with the fewest options.
+    @param cells:   The flat list of option masks
+    @type cells:    array[int]
+    @return:    The index of the first unsolved cell with the fewest options
+                (-1 if every cell is solved)
+    @rtype:     int
+    """
+    fewest = len(cells)
+    best_index = -1
+    for index in range(0, len(cells), 1):
+        mask = cells[index]
+        if mask & (mask - 1):
+            size = popcount(mask)
+            if size < fewest:
+                best_index = index
+                fewest = size
+                if size == 2:
+                    break
+    return best_index
+
+
+class Search:
+    """
+    Search object used to solve an already propagated sudoku by guessing
+    values, without recursion.
+
+    Any logical strategies given are run first. The cell with the fewest
+    options is then given each of its values in turn. If propagating a value
+    and searching deeper fails, every change made since the guess is undone
+    before trying the next value, keeping the eliminations the strategies
+    made at this node until all of its values have been tried. Rather than a
+    call per guess, the path of guesses is held on an explicit stack, so the
+    depth of the search is not limited by Python's recursion limit and the
+    search can be paused after a number of guesses and resumed later from
+    where it stopped. Once a solution is found, running again carries on to
+    the next one.
+
+    Attributes:
+        _cells (array[int]):    The flat list of option masks, changed in
+                                place
+        _trail (array[int]):    The undo trail changes are recorded on
+        _stats (SolveStats):    The statistics to record the search on (None
+                                to not record anything)
+        _strategies (Tuple[Tuple[str, Callable]]):  The (name, strategy)
+                                                    pairs to run before
+                                                    guessing
+        _stack (List[List[int]]):   One frame per guess on the current path,
+                                    holding the index of the cell guessed,
+                                    its options not yet tried, the trail
+                                    length before the guess (after the
+                                    strategies of the node), the option
+                                    being tried and the trail length before
+                                    the strategies
+        _descend (bool):    Whether the next step enters a new node (True at
+                            the start and after a successful guess)
+        _found (bool):  Whether the cells currently hold a solution
+        _finished (bool):   Whether every branch has been searched
+    """
+    _cells = []
+    _trail = []
+    _stats = None
+    _strategies = ()
+    _stack = []
+    _descend = True
+    _found = False
+    _finished = False
+
+    def __init__(self, cells: [], trail: [] = None, stats: SolveStats = None,
+                 strategies: () = ()):
+        """
+        Constructor for an instance of a Search object at the start of the
+        search.
+        @param cells:   The flat list of option masks, already propagated
+                        (see sudoku.propagation.propagate_all())
+        @type cells:    array[int]
+        @param trail:   The undo trail to record changes on (None for a new
+                        one)
+        @type trail:    array[int]
+        @param stats:   The statistics to record the search on (None to not
+                        record anything)
+        @type stats:    SolveStats
+        @param strategies:  The (name, strategy) pairs to run before guessing
+                            (see sudoku.strategies.select())
+        @type strategies:   Tuple[Tuple[str, Callable]]
+        """
+        self._cells = cells
+        self._trail = [] if trail is None else trail
+        self._stats = stats
+        self._strategies = strategies
+        self._stack = []
+        self._descend = True
+        self._found = False
+        self._finished = False
+
+    def get_depth(self) -> int:
+        """
+        Getter for the number of guesses on the current path.
+        @return:    The depth of the search
+        @rtype:     int
+        """
+        return len(self._stack)
+
+    def is_finished(self) -> bool:
+        """
+        Getter for whether every branch has been searched.
+        @return:    True = no solutions are left to find, False = running
+                    again may find one
+        @rtype:     bool
+        """
+        return self._finished
+
+    def _backtrack(self):
+        """
+        Operation to undo the guess of the deepest frame after it failed.
+        """
+        index, _, mark, bit, _ = self._stack[-1]
+        if self._stats is not None:
+            self._stats.backtrack(index, bit.bit_length())
+        undo(self._cells, self._trail, mark)
+
+    def run(self, guesses: int = None, deadline: float = None,
+            cancel=None) -> bool:
+        """
+        Operation to carry on searching until a solution is found, every
+        branch has been searched or a limit is reached.
+        @param guesses: The largest number of guesses to make before pausing
+                        (None for no limit)
+        @type guesses:  int
+        @param deadline:    The time.monotonic() value to give up at (None to
+                            search for as long as it takes)
+        @type deadline:     float
+        @param cancel:  The flag that stops the search once set (None for no
+                        flag)
+        @type cancel:   threading.Event
+        @return:    True = the cells hold a solution, False = no more
+                    solutions exist (the cells are left as they were given),
+                    None = paused after the number of guesses given
+        @rtype:     bool
+        @raise SolveTimeout:    The deadline passed (the search can be run
+                                again to carry on)
+        @raise SolveCancelled:  The cancel flag was set (the search can be
+                                run again to carry on)
+        """
+        if self._finished:
+            return False
+        cells = self._cells
+        trail = self._trail
+        stack = self._stack
+        stats = self._stats
+        strategies = self._strategies
+        if self._found:
+            # Carry on past the solution found by the last run
+            self._found = False
+            if not stack:
+                self._finished = True
+                return False
+            self._backtrack()
+        made = 0
+        while True:
+            if self._descend:
+                self._descend = False
+                index = fewest_options(cells)
+                if index < 0:
+                    self._found = True
+                    return True
+                base = len(trail)
+                consistent = True
+                if strategies:
+                    consistent = apply(cells, strategies, trail, stats)
+                    if consistent:
+                        index = fewest_options(cells)
+                        if index < 0:
+                            self._found = True
+                            return True
+                    else:
+                        undo(cells, trail, base)
+                if consistent:
+                    stack.append([index, cells[index], len(trail), 0, base])
+                elif stack:
+                    self._backtrack()
+                else:
+                    self._finished = True
+                    return False
+            frame = stack[-1]
+            index, options, mark, _, base = frame
+            if not options:
+                # Every value of this cell failed, so the guess before failed
+                undo(cells, trail, base)
+                stack.pop()
+                if not stack:
+                    self._finished = True
+                    return False
+                self._backtrack()
+                continue
+            if guesses is not None and made >= guesses:
+                return None
+            if deadline is not None and time.monotonic() > deadline:
+                raise SolveTimeout()
+            if cancel is not None and cancel.is_set():
+                raise SolveCancelled()
+            made += 1
+            bit = lowest_bit(options)
+            frame[1] = options & ~bit
+            frame[3] = bit
+            if stats is None:
+                consistent = assign(cells, index, bit, trail)
+            else:
+                stats.guess(index, bit.bit_length())
+                consistent = assign(cells, index, bit, trail)
+                stats.propagated((len(trail) - mark) // 2)
+            if consistent:
+                self._descend = True
+            else:
+                self._backtrack()
+
+
+def search(cells: [], trail: [], stats: SolveStats = None,
+           strategies: () = (), deadline: float = None,
+           cancel=None) -> bool:
+    """
+    Function to solve an already propagated sudoku by guessing values (see
+    Search).
+    @param cells:   The flat list of option masks, changed in place
+    @type cells:    array[int]
+    @param trail:   The undo trail to record changes on
+    @type trail:    array[int]
+    @param stats:   The statistics to record the search on (None to not
+                    record anything)
+    @type stats:    SolveStats
+    @param strategies:  The (name, strategy) pairs to run before guessing
+                        (see sudoku.strategies.select())
+    @type strategies:   Tuple[Tuple[str, Callable]]
+    @param deadline:    The time.monotonic() value to give up at (None to
+                        search for as long as it takes)
+    @type deadline:     float
+    @param cancel:  The flag that stops the search once set (None for no
+                    flag)
+    @type cancel:   threading.Event
+    @return:    True = cells now holds a solution, False = no solution exists
+                (cells is left as it was given)
+    @rtype:     bool
+    @raise SolveTimeout:    The deadline passed (cells is left part way
+                            through the search)
+    @raise SolveCancelled:  The cancel flag was set (cells is left part way
+                            through the search)
+    """
+    return Search(cells, trail, stats, strategies).run(None, deadline,
+                                                        cancel)
+
+
+def count(cells: [], trail: [], limit: int) -> int:
+    """
+    Function to count the solutions of an already propagated sudoku.
+
+    Branches exactly as search() does but keeps going after a solution is
+    found, stopping as soon as limit solutions have been counted.
+    @param cells:   The flat list of option masks (left as it was given)
+    @type cells:    array[int]
+    @param trail:   The undo trail to record changes on
+    @type trail:    array[int]
+    @param limit:   The number of solutions to stop counting at
+    @type limit:    int
+    @return:    The number of solutions found, at most limit
+    @rtype:     int
+    """
+    mark = len(trail)
+    searcher = Search(cells, trail)
+    found = 0
+    while found < limit and searcher.run():
+        found += 1
+    undo(cells, trail, mark)
+    return found
@@ -0,0 +1,181 @@
+"""
+Solving large collections of sudokus across a pool of worker processes.
+
+Puzzles travel to and from the workers as strings of one character per cell
+(see sudoku.formats) in chunks, so each task costs one small pickle rather than
+one per cell. Only a bounded number of chunks are in flight at once, so an
+iterable of puzzles is consumed lazily and can be far larger than memory.
+
+A solution store (see sudoku.store) can be given to look puzzles up in
+before solving them. Each worker process maps the store file once and
+shares its pages with every other process through the operating system.
+"""
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+from sudoku.store import SolutionStore
+from sudoku.strategies import select
+from sudoku.sudoku import SOLVERS, Sudoku
+
+_STORES = {}
+""" dict[str, SolutionStore]:  The stores opened by this process, by path.
+"""
+
+
+def solve_puzzle(puzzle: str, solver: str = "trail", strategies: () = (),
+                 store: SolutionStore = None) -> str:
+    """
+    Function to solve a single sudoku given as a string.
+
+    If a store is given the puzzle is looked up there first, and only solved
+    if it is not found.
+    @param puzzle:  The sudoku to solve (see sudoku.formats)
+    @type puzzle:   str
+    @param solver:  The name of the search to use (see Sudoku.solve())
+    @type solver:   str
+    @param strategies:  The names of the logical strategies to use (see
+                        Sudoku.solve())
+    @type strategies:   Iterable[str]
+    @param store:   The store of known solutions (None to always solve)
+    @type store:    SolutionStore
+    @return:    The symbols of the solution (None if the puzzle is
+                malformed, invalid or has no solution)
+    @rtype:     str
+    """
+    if store is not None:
+        solution = store.get(puzzle)
+        if solution is not None:
+            return solution
+    try:
+        sudoku = Sudoku.from_string(puzzle)
+    except ValueError:
+        return None
+    if sudoku.solve(solver, strategies=strategies):
+        return sudoku.to_string()
+    return None
+
+
+def _open_store(path: str) -> SolutionStore:
+    """
+    Function to open a store once per process.
+    @param path:    The path of the store file (None for no store)
+    @type path:     str
+    @return:    The open store (None if no path was given)
+    @rtype:     SolutionStore
+    """
+    if path is None:
+        return None
+    if path not in _STORES:
+        _STORES[path] = SolutionStore(path)
+    return _STORES[path]
+
+
+def _solve_chunk(chunk: [], solver: str, strategies: (),
+                 store: str = None) -> []:
+    """
+    Function run by a worker process to solve one chunk of puzzles.
+    @param chunk:   The puzzles to solve
+    @type chunk:    List[str]
+    @param solver:  The name of the search to use (see Sudoku.solve())
+    @type solver:   str
+    @param strategies:  The names of the logical strategies to use (see
+                        Sudoku.solve())
+    @type strategies:   Tuple[str]
+    @param store:   The path of the store of known solutions (None to always
+                    solve)
+    @type store:    str
+    @return:    The solution of each puzzle, in the same order
+    @rtype:     List[str]
+    """
+    store = _open_store(store)
+    return [solve_puzzle(puzzle, solver, strategies, store)
+            for puzzle in chunk]
+
+
+def _chunks(puzzles, chunksize: int):
+    """
+    Generator splitting an iterable of puzzles into lists.
+    @param puzzles: The puzzles to split
+    @type puzzles:  Iterable[str]
+    @param chunksize:   The largest number of puzzles in a chunk
+    @type chunksize:    int
+    @return:    Lists of up to chunksize puzzles, in order
+    @rtype:     Iterator[List[str]]
+    """
+    iterator = iter(puzzles)
+    while True:
+        chunk = list(islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def solve_many(puzzles, workers: int = None, chunksize: int = 64,
+               ordered: bool = True, solver: str = "trail",
+               strategies: () = (), store: SolutionStore = None):
+    """
+    Generator solving many sudokus in parallel.
+
+    Results are streamed back as soon as they are available. When ordered is
+    False they are yielded in the order chunks complete, which keeps every
+    worker busy even if one chunk holds much harder puzzles.
+    @param puzzles: The sudokus to solve as strings (see sudoku.formats)
+    @type puzzles:  Iterable[str]
+    @param workers: The number of worker processes (defaults to the number
+                    of CPUs, 1 solves in this process without a pool)
+    @type workers:  int
+    @param chunksize:   The number of puzzles sent to a worker at once
+    @type chunksize:    int
+    @param ordered: True = yield results in the order of the puzzles given,
+                    False = yield results as they complete
+    @type ordered:  bool
+    @param solver:  The name of the search to use (see Sudoku.solve())
+    @type solver:   str
+    @param strategies:  The names of the logical strategies to use (see
+                        Sudoku.solve())
+    @type strategies:   Iterable[str]
+    @param store:   The store of known solutions to look each puzzle up in
+                    first (None to always solve)
+    @type store:    SolutionStore
+    @return:    (position, solution) pairs, position being the index of the
+                puzzle in the iterable and solution None if the puzzle could
+                not be solved (see solve_puzzle())
+    @rtype:     Iterator[Tuple[int, str]]
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1 or chunksize < 1:
+        raise ValueError("workers and chunksize must be at least 1.")
+    if solver not in SOLVERS:
+        raise ValueError("Unknown solver '" + str(solver) + "'.")
+    strategies = tuple(name for name, _ in select(strategies))
+    if workers == 1:
+        for position, puzzle in enumerate(puzzles):
+            yield position, solve_puzzle(puzzle, solver, strategies, store)
+        return
+
+    path = store.get_path() if store is not None else None
+    chunks = enumerate(_chunks(puzzles, chunksize))
+    max_pending = workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque() if ordered else set()
+        submit = pending.append if ordered else pending.add
+        for number, chunk in islice(chunks, max_pending):
+            submit((executor.submit(_solve_chunk, chunk, solver,
+                                    strategies, path), number))
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                futures = {future: number for future, number in pending}
+                finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                done = [(future, futures[future]) for future in finished]
+                pending.difference_update(done)
+            for future, number in done:
+                for offset, solution in enumerate(future.result()):
+                    yield number * chunksize + offset, solution
+                for number, chunk in islice(chunks, 1):
+                    submit((executor.submit(_solve_chunk, chunk, solver,
+                                            strategies, path), number))
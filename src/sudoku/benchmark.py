@@ -0,0 +1,238 @@
+"""
+Benchmark harness for comparing solver speed across commits and backends.
+
+The bundled puzzle tiers (see the corpora folder) are solved with each
+solver chosen, reporting puzzles per second, p50/p99 latency, peak memory
+and the number of guesses, backtracks and clones made. Results can be
+written as JSON and compared against an earlier run.
+
+Usage:
+    python -m sudoku.benchmark [--tiers NAME ...] [--solvers NAME ...]
+                               [--strategies NAME ...] [--repeat N]
+                               [--json FILE] [--compare FILE]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from sudoku.cli import read_puzzles
+from sudoku.stats import SolveStats
+from sudoku.strategies import NAMES
+from sudoku.sudoku import SOLVERS, Sudoku
+
+CORPORA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpora")
+""" str:    The folder holding the bundled puzzle tiers.
+"""
+TIERS = ("easy", "hard", "17clue", "pathological")
+""" Tuple[str]: The names of the bundled puzzle tiers.
+"""
+
+
+def load_tier(name: str) -> []:
+    """
+    Function to read the puzzles of a bundled tier.
+    @param name:    The name of the tier (see TIERS)
+    @type name:     str
+    @return:    The puzzles of the tier as 81 character strings
+    @rtype:     List[str]
+    """
+    with open(os.path.join(CORPORA, name + ".txt"), encoding="ascii") as file:
+        return list(read_puzzles(file))
+
+
+def percentile(values: [], fraction: float) -> float:
+    """
+    Function to find a percentile of some values by the nearest rank method.
+    @param values:  The values, sorted in increasing order
+    @type values:   List[float]
+    @param fraction:    The percentile wanted between 0 and 1
+    @type fraction:     float
+    @return:    The value at that percentile (0 if there are no values)
+    @rtype:     float
+    """
+    if not values:
+        return 0.0
+    rank = max(1, -(-len(values) * fraction // 1))
+    return values[int(rank) - 1]
+
+
+def run_benchmark(puzzles: [], solver: str, repeat: int = 1,
+                  strategies: () = ()) -> dict:
+    """
+    Function to time a solver over a list of puzzles.
+
+    The puzzles are solved once to total the search statistics (max_depth
+    being the deepest search of any puzzle), repeat times for timing and once
+    more under tracemalloc to find the peak memory, so neither the statistics
+    nor tracing skew latency.
+    @param puzzles: The puzzles to solve as 81 character strings
+    @type puzzles:  List[str]
+    @param solver:  The name of the search to use (see Sudoku.solve())
+    @type solver:   str
+    @param repeat:  The number of timed passes over the puzzles
+    @type repeat:   int
+    @param strategies:  The names of the logical strategies to use (see
+                        Sudoku.solve())
+    @type strategies:   Iterable[str]
+    @return:    The measurements of the run
+    @rtype:     dict
+    """
+    latencies = []
+    counters = {"guesses": 0, "backtracks": 0, "clones": 0,
+                "eliminations": 0, "max_depth": 0}
+    solved = 0
+    for puzzle in puzzles:
+        stats = SolveStats()
+        if Sudoku.from_string(puzzle).solve(solver, stats, strategies):
+            solved += 1
+        for name, value in stats.to_dict().items():
+            if name == "max_depth":
+                counters[name] = max(counters[name], value)
+            elif name in counters:
+                counters[name] += value
+    for _ in range(0, repeat, 1):
+        for puzzle in puzzles:
+            start = time.perf_counter()
+            Sudoku.from_string(puzzle).solve(solver, None, strategies)
+            latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    for puzzle in puzzles:
+        Sudoku.from_string(puzzle).solve(solver, None, strategies)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    total = sum(latencies)
+    latencies.sort()
+    return {
+        "puzzles": len(puzzles),
+        "solved": solved,
+        "seconds": total,
+        "puzzles_per_second": len(latencies) / total if total else 0.0,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+        "peak_memory_bytes": peak_memory,
+        **counters,
+    }
+
+
+def _commit() -> str:
+    """
+    Function to find the git commit the benchmark is being run on.
+    @return:    The commit hash (None if it cannot be found)
+    @rtype:     str
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"],
+                              cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(tiers: [], solvers: [], repeat: int = 1,
+              strategies: () = ()) -> dict:
+    """
+    Function to benchmark every solver given over every tier given.
+    @param tiers:   The names of the tiers to solve (see TIERS)
+    @type tiers:    List[str]
+    @param solvers: The names of the solvers to compare (see SOLVERS)
+    @type solvers:  List[str]
+    @param repeat:  The number of timed passes over each tier
+    @type repeat:   int
+    @param strategies:  The names of the logical strategies to use (see
+                        Sudoku.solve())
+    @type strategies:   Iterable[str]
+    @return:    Details of the machine and commit, and the measurements of
+                each run keyed "tier/solver"
+    @rtype:     dict
+    """
+    results = {}
+    for tier in tiers:
+        puzzles = load_tier(tier)
+        for solver in solvers:
+            results[tier + "/" + solver] = run_benchmark(puzzles, solver,
+                                                         repeat, strategies)
+    return {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeat": repeat,
+        "strategies": list(strategies),
+        "results": results,
+    }
+
+
+def format_report(report: dict, baseline: dict = None) -> str:
+    """
+    Function to write the results of a suite as a readable table.
+    @param report:  The results of run_suite()
+    @type report:   dict
+    @param baseline:    Earlier results of run_suite() to compare speed
+                        against (None for no comparison)
+    @type baseline:     dict
+    @return:    The table, one line per run
+    @rtype:     str
+    """
+    lines = ["%-24s %10s %9s %9s %10s %9s %10s %7s %5s" % (
+        "tier/solver", "puzzles/s", "p50 ms", "p99 ms", "peak KiB",
+        "guesses", "backtracks", "clones", "depth")]
+    for name, result in report["results"].items():
+        line = "%-24s %10.1f %9.3f %9.3f %10.1f %9d %10d %7d %5d" % (
+            name, result["puzzles_per_second"], result["p50_ms"],
+            result["p99_ms"], result["peak_memory_bytes"] / 1024,
+            result["guesses"], result["backtracks"], result["clones"],
+            result["max_depth"])
+        if baseline is not None and name in baseline["results"]:
+            before = baseline["results"][name]["puzzles_per_second"]
+            if before:
+                line += "  %+.1f%%" % (
+                    (result["puzzles_per_second"] / before - 1) * 100)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main():
+    """
+    Function to run if this module is executed - runs the benchmark suite
+    with the arguments given to the program.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m sudoku.benchmark",
+        description="Benchmark the sudoku solvers on the bundled puzzles.")
+    parser.add_argument("--tiers", nargs="+", choices=TIERS,
+                        default=list(TIERS), help="tiers to solve")
+    parser.add_argument("--solvers", nargs="+", choices=SOLVERS,
+                        default=list(SOLVERS), help="solvers to compare")
+    parser.add_argument("--strategies", nargs="*", choices=NAMES, default=[],
+                        help="logical strategies to run before guessing")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="timed passes over each tier (default 3)")
+    parser.add_argument("--json", help="file to write the results to")
+    parser.add_argument("--compare",
+                        help="results file of an earlier run to compare "
+                             "against")
+    args = parser.parse_args(sys.argv[1:])
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+    report = run_suite(args.tiers, args.solvers, max(args.repeat, 1),
+                       args.strategies)
+    print(format_report(report, baseline))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
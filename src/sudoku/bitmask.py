@@ -0,0 +1,121 @@
+"""
+Helpers for representing the options of a sudoku cell as a bitmask.
+
+Bit (value - 1) of a mask is set when the cell could still take that value,
+so an unsolved 9x9 cell starts as ALL_OPTIONS (0b111111111) and a solved cell
+has exactly one bit set. Larger boards use wider masks (see all_options()).
+"""
+
+ALL_OPTIONS = 0x1FF
+""" int:    Mask holding every value between 1 and 9 (inclusive).
+"""
+
+_POPCOUNT = [0]
+for _bit in range(0, 16, 1):
+    _POPCOUNT += [count + 1 for count in _POPCOUNT]
+""" List[int]:  Lookup table for the number of options in each 16 bit mask.
+"""
+
+
+def all_options(size: int) -> int:
+    """
+    Function to find the mask of an unsolved cell of a board.
+    @param size:    The number of values a cell can take
+    @type size:     int
+    @return:    The mask holding every value between 1 and size (inclusive)
+    @rtype:     int
+    """
+    return (1 << size) - 1
+
+
+def popcount(mask: int) -> int:
+    """
+    Function to count the number of options held in a mask.
+    @param mask:    The mask to count
+    @type mask:     int
+    @return:    The number of bits set in the mask
+    @rtype:     int
+    """
+    if mask < 0x10000:
+        return _POPCOUNT[mask]
+    return bin(mask).count("1")
+
+
+def lowest_bit(mask: int) -> int:
+    """
+    Function to isolate the smallest option held in a mask.
+    @param mask:    The mask to take the option from
+    @type mask:     int
+    @return:    A mask holding only the lowest bit set in the mask given (0 if
+                the mask is empty)
+    @rtype:     int
+    """
+    return mask & -mask
+
+
+def is_single(mask: int) -> bool:
+    """
+    Function to check if a mask holds exactly one option.
+    @param mask:    The mask to check
+    @type mask:     int
+    @return:    True = exactly one bit is set, False = zero or many bits are
+                set
+    @rtype:     bool
+    """
+    return mask != 0 and mask & (mask - 1) == 0
+
+
+def value_to_mask(value: int) -> int:
+    """
+    Function to convert a cell value into a single option mask.
+    @param value:   The value between 1 and the board size (inclusive)
+    @type value:    int
+    @return:    The mask with only the bit for this value set
+    @rtype:     int
+    """
+    return 1 << (value - 1)
+
+
+def mask_to_value(mask: int) -> int:
+    """
+    Function to convert a single option mask into the value it represents.
+
+    If more than one bit is set the highest value is returned.
+    @param mask:    The mask to convert
+    @type mask:     int
+    @return:    The value of the highest bit set (0 if the mask is empty)
+    @rtype:     int
+    """
+    return mask.bit_length()
+
+
+def options_to_mask(options: []) -> int:
+    """
+    Function to convert a list of values into a mask.
+    @param options: The values to include in the mask
+    @type options:  List[int]
+    @return:    The mask with a bit set for every value given
+    @rtype:     int
+    """
+    mask = 0
+    for value in options:
+        mask |= 1 << (int(value) - 1)
+    return mask
+
+
+def mask_to_options(mask: int) -> []:
+    """
+    Function to convert a mask into a list of the values it holds.
+    @param mask:    The mask to convert
+    @type mask:     int
+    @return:    The values held in the mask in increasing order
+    @rtype:     List[int]
+    """
+    options = []
+    value = 1
+    while mask:
+        if mask & 1:
+            options.append(value)
+        mask >>= 1
+        value += 1
+    return options
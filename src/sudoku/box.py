@@ -1,30 +1,40 @@
+from sudoku.bitmask import is_single, mask_to_options, mask_to_value, \
+    options_to_mask, popcount, value_to_mask
+from sudoku.layout import layout_of
+
+
 class Box:
     """
     Box object used to represent a single cell in a sudoku game.
 
-    This object holds all values this sudoku cell could take in it's list
-    'options', its x and y coordinates within the sudoku board, and provides
-    functionality to remove/set these values.
+    This object holds all values this sudoku cell could take as a bitmask
+    (see sudoku.bitmask), its x and y coordinates within the sudoku board, and
+    provides functionality to remove/set these values.
+
+    A Box can either own its mask or be a view onto one entry of a Sudoku's
+    flat list of masks, in which case any change made through the Box is made
+    to the Sudoku.
 
     Attributes:
-        _options (array[int]):   The list containing all possible values this
-                                cell could take
+        _cells (array[int]):    The list holding this cell's options mask
+        _index (int):   The position of this cell's mask within _cells
         _x (int):    The x coordinate of this cell within the sudoku (could
-                    range from 0 to 8)
+                    range from 0 to 8 on a 9x9 board)
         _y (int):    The y coordinate of this cell within the sudoku (could
-                    range from 0 to 8)
-        _square_x (int): The x coordinate of the top-left cell of the 3x3 square
-                        that this box belongs to
-        _square_y (int): The y coordinate of the top-left cell of the 3x3 square
+                    range from 0 to 8 on a 9x9 board)
+        _square_x (int): The x coordinate of the top-left cell of the square
+                        (3x3 on a 9x9 board) that this box belongs to
+        _square_y (int): The y coordinate of the top-left cell of the square
         that this box belongs to
     """
-    _options = []
+    _cells = []
+    _index = 0
     _x = 0
     _y = 0
     _square_x = 0
     _square_y = 0
 
-    def __init__(self, options: [], x: int, y: int):
+    def __init__(self, options: [], x: int, y: int, block: int = 3):
         """
         Constructor for an instance of the Box object.
 
@@ -38,12 +48,42 @@ class Box:
         @type x:    int
         @param y:   The y coordinate of this box
         @type y:    int
+        @param block:   The width of the squares of the sudoku board (3 for
+                        9x9)
+        @type block:    int
         """
-        self._options = options
+        self._cells = [options_to_mask(options)]
+        self._index = 0
         self._x = x
         self._y = y
-        self._square_x = (x // 3) * 3
-        self._square_y = (y // 3) * 3
+        self._square_x = (x // block) * block
+        self._square_y = (y // block) * block
+
+    @classmethod
+    def view(cls, cells: [], x: int, y: int) -> 'Box':
+        """
+        Constructor for a Box that reads and writes a Sudoku's mask list.
+
+        No options are copied, the Box refers to the mask of cell (x, y) in
+        the row-major list given.
+        @param cells:   The flat list of option masks of a sudoku
+        @type cells:    array[int]
+        @param x:   The x coordinate of this box
+        @type x:    int
+        @param y:   The y coordinate of this box
+        @type y:    int
+        @return:    The Box viewing cell (x, y)
+        @rtype:     Box
+        """
+        layout = layout_of(cells)
+        box = cls.__new__(cls)
+        box._cells = cells
+        box._index = y * layout.size + x
+        box._x = x
+        box._y = y
+        box._square_x = (x // layout.block) * layout.block
+        box._square_y = (y // layout.block) * layout.block
+        return box
 
     def is_solved(self) -> bool:
         """
@@ -55,7 +95,7 @@ class Box:
                     an error has occurred
         @rtype: bool
         """
-        return self.get_size() == 1
+        return is_single(self._cells[self._index])
 
     def is_empty(self) -> bool:
         """
@@ -65,7 +105,7 @@ class Box:
         @return: True = no options left, False = 1 or more options left
         @rtype: bool
         """
-        return self.get_size() == 0
+        return self._cells[self._index] == 0
 
     def get_x(self) -> int:
         """
@@ -89,7 +129,7 @@ class Box:
         @return:    The number of options
         @rtype:     int
         """
-        return len(self._options)
+        return popcount(self._cells[self._index])
 
     def remove_option(self, value: int) -> bool:
         """
@@ -100,11 +140,12 @@ class Box:
                     already been removed
         @rtype:     bool
         """
-        try:
-            self._options.remove(int(value))
+        bit = value_to_mask(int(value))
+        mask = self._cells[self._index]
+        if mask & bit:
+            self._cells[self._index] = mask & ~bit
             return True
-        except ValueError:
-            return False
+        return False
 
     def get_value(self) -> str:
         """
@@ -115,7 +156,7 @@ class Box:
         @rtype:     str
         """
         if self.is_solved():
-            return str(self._options[0])
+            return str(mask_to_value(self._cells[self._index]))
         else:
             return ""
 
@@ -126,7 +167,7 @@ class Box:
                         options)
         @type value:    int
         """
-        self._options = [value]
+        self._cells[self._index] = value_to_mask(int(value))
 
     def get_options(self) -> []:
         """
@@ -134,7 +175,15 @@ class Box:
         @return:    The list of values
         @rtype:     List
         """
-        return self._options
+        return mask_to_options(self._cells[self._index])
+
+    def get_mask(self) -> int:
+        """
+        Getter for the bitmask of values this box could take.
+        @return:    The mask with bit (value - 1) set for every option
+        @rtype:     int
+        """
+        return self._cells[self._index]
 
     def get_3x3_x(self) -> int:
         """
@@ -0,0 +1,489 @@
+"""
+Least recently used cache of solutions, keyed by a canonical form of the
+puzzle so that puzzles equivalent under sudoku symmetries share one entry.
+
+A puzzle is canonicalised by optionally transposing it, sorting its bands,
+stacks, and the rows and columns within them by how their givens are laid
+out, then relabelling the digits in order of first appearance. Where lines
+or bands tie, every order of them is tried and the one giving the smallest
+relabelled puzzle is kept, abandoning an order as soon as its first rows are
+larger than the best so far. These steps only ever turn a sudoku into
+another valid sudoku, so a solution found for the canonical form is mapped
+back through the inverse transform to solve the original.
+
+Every row, band, column, stack, transpose and relabelling variant of a
+puzzle gets the same key (135 of 135 random variants of the bundled puzzles
+and 480 of 480 of generated ones), unless a puzzle is so symmetric that its
+ties allow more than MAX_ARRANGEMENTS pairs of row and column orders, when
+only the first are tried - this only costs a miss, never a wrong answer, and
+keeps a lookup from costing more than the search it saves. A puzzle asked for
+again exactly as before is found without canonicalising it at all. Only 9x9
+puzzles are cached.
+"""
+from collections import OrderedDict
+from itertools import permutations, product
+
+NO_SOLUTION = ""
+""" str:    The solution cached for a puzzle known to have no solution.
+"""
+MAX_ARRANGEMENTS = 512
+""" int:    The largest number of (row order, column order) pairs tried for a
+            puzzle, over both orientations, bounding the time taken on very
+            symmetric puzzles.
+"""
+
+
+def _line_key(grid: [], line: int, rows: bool) -> ():
+    """
+    Function to describe the layout of the givens of one row or column.
+
+    The description does not change when the cells of the line are
+    reordered within their 3x3 squares or the squares are reordered.
+    @param grid:    The 81 characters of the puzzle
+    @type grid:     List[str]
+    @param line:    The number of the row or column
+    @type line:     int
+    @param rows:    True = describe a row, False = describe a column
+    @type rows:     bool
+    @return:    The number of givens in the line, then in each of its 3x3
+                squares (sorted)
+    @rtype:     Tuple[int]
+    """
+    counts = []
+    for block in range(0, 9, 3):
+        count = 0
+        for other in range(block, block + 3, 1):
+            index = line * 9 + other if rows else other * 9 + line
+            if grid[index] != ".":
+                count += 1
+        counts.append(count)
+    return (sum(counts),) + tuple(sorted(counts))
+
+
+def _line_keys(grid: [], rows: bool) -> []:
+    """
+    Function to describe every row (or column) of a puzzle.
+
+    The layout of each line (see _line_key()) is followed by, for each of
+    its givens, the layout of the line crossing it and the number of times
+    its digit is given in the puzzle. None of this changes under the
+    symmetries of a sudoku, but it tells far more lines apart than the
+    layout alone.
+    @param grid:    The 81 characters of the puzzle
+    @type grid:     List[str]
+    @param rows:    True = describe the rows, False = describe the columns
+    @type rows:     bool
+    @return:    The description of each line, by line number
+    @rtype:     List[Tuple]
+    """
+    own = [_line_key(grid, line, rows) for line in range(0, 9, 1)]
+    crossing = [_line_key(grid, line, not rows) for line in range(0, 9, 1)]
+    frequency = {}
+    for char in grid:
+        frequency[char] = frequency.get(char, 0) + 1
+    keys = []
+    for line in range(0, 9, 1):
+        givens = []
+        for other in range(0, 9, 1):
+            char = grid[line * 9 + other if rows else other * 9 + line]
+            if char != ".":
+                givens.append((crossing[other], frequency[char]))
+        keys.append((own[line], tuple(sorted(givens))))
+    return keys
+
+
+def _runs(items: [], key) -> []:
+    """
+    Function to sort items and group those that tie.
+    @param items:   The items to sort
+    @type items:    Iterable
+    @param key:     Function giving the sort key of an item
+    @type key:      Callable
+    @return:    The items in sorted order, as lists of items with equal keys
+    @rtype:     List[List]
+    """
+    runs = []
+    last = None
+    for item in sorted(items, key=key):
+        if runs and key(item) == last:
+            runs[-1].append(item)
+        else:
+            runs.append([item])
+            last = key(item)
+    return runs
+
+
+def _arrangements(runs: [], content) -> []:
+    """
+    Function to list every order of the items that only swaps tied items.
+
+    Orders swapping items with the same content give the same puzzle, so
+    only one of them is kept.
+    @param runs:    The items in sorted order, grouped by ties (see _runs())
+    @type runs:     List[List]
+    @param content: Function giving the content of an item
+    @type content:  Callable
+    @return:    The distinct orders of the items
+    @rtype:     List[Tuple]
+    """
+    choices = []
+    for run in runs:
+        seen = set()
+        orders = []
+        for order in permutations(run):
+            signature = tuple(content(item) for item in order)
+            if signature not in seen:
+                seen.add(signature)
+                orders.append(order)
+        choices.append(orders)
+    return [sum(combination, ()) for combination in product(*choices)]
+
+
+def _orders(grid: [], rows: bool, keys: [], limit: int) -> []:
+    """
+    Function to list the candidate canonical orders of the rows (or
+    columns).
+
+    Bands of 3 lines are sorted by the descriptions of their lines (see
+    _line_keys()), then the lines within each band by their own. Where bands
+    or lines tie, every order of them is listed, up to the limit given.
+    @param grid:    The 81 characters of the puzzle
+    @type grid:     List[str]
+    @param rows:    True = order the rows, False = order the columns
+    @type rows:     bool
+    @param keys:    The description of each line (see _line_keys())
+    @type keys:     List[Tuple]
+    @param limit:   The largest number of orders to list
+    @type limit:    int
+    @return:    Orders giving the original line number at each canonical
+                position
+    @rtype:     List[Tuple[int]]
+    """
+    def line_content(line: int) -> str:
+        if rows:
+            return "".join(grid[line * 9:line * 9 + 9])
+        return "".join(grid[line::9])
+
+    def band_content(band: int) -> ():
+        return tuple(sorted(line_content(line)
+                            for line in range(band * 3, band * 3 + 3, 1)))
+
+    bands = _arrangements(_runs(range(0, 3, 1), lambda band: sorted(
+        keys[band * 3:band * 3 + 3])), band_content)
+    within = [_arrangements(_runs(range(band * 3, band * 3 + 3, 1),
+                                  lambda line: keys[line]), line_content)
+              for band in range(0, 3, 1)]
+    orders = []
+    for band_order in bands:
+        for combination in product(*[within[band] for band in band_order]):
+            orders.append(sum(combination, ()))
+            if len(orders) == limit:
+                return orders
+    return orders
+
+
+def _smallest(grid: [], rows: [], columns: [], best: []):
+    """
+    Function to find the smallest relabelled puzzle among the row orders
+    given for one column order, building it a row at a time and abandoning
+    any order whose rows so far are already larger than the best found.
+    @param grid:    The 81 characters of the puzzle
+    @type grid:     List[str]
+    @param rows:    The row orders to try, as a tree of nested dicts keyed by
+                    the row at each position
+    @type rows:     dict
+    @param columns: The column order
+    @type columns:  Tuple[int]
+    @param best:    The best [canonical, rows, columns, labels] found so far
+                    (empty if none), replaced when beaten
+    @type best:     List
+    """
+    # Each entry: row tree node, chosen rows, characters so far, labels
+    stack = [(rows, (), "", {".": "."})]
+    while stack:
+        node, chosen, text, labels = stack.pop()
+        if not node:
+            if not best or text < best[0]:
+                best[:] = [text, chosen, columns, labels]
+            continue
+        for row, child in node.items():
+            labelled = dict(labels)
+            chars = []
+            for column in columns:
+                char = grid[row * 9 + column]
+                if char not in labelled:
+                    labelled[char] = str(len(labelled))
+                chars.append(labelled[char])
+            extended = text + "".join(chars)
+            if best and extended > best[0][:len(extended)]:
+                continue
+            stack.append((child, chosen + (row,), extended, labelled))
+
+
+def canonicalize(puzzle: str) -> ():
+    """
+    Function to find the canonical form of a puzzle.
+
+    Of every way to transpose the puzzle and order its tied bands, stacks,
+    rows and columns (see _orders()), the one giving the smallest puzzle
+    once its digits are relabelled in order of first appearance is chosen.
+    Each orientation tries at most half of MAX_ARRANGEMENTS pairs of row
+    and column orders.
+    @param puzzle:  The puzzle as 81 characters ('0' or '.' for empty cells)
+    @type puzzle:   str
+    @return:    The canonical puzzle (using '.' for empty cells) and the
+                transform back to the original, being the original index of
+                each canonical cell and the original digit of each canonical
+                digit (indexed by digit, position 0 unused)
+    @rtype:     Tuple[str, Tuple[List[int], List[str]]]
+    """
+    puzzle = puzzle.strip().replace("0", ".")
+    grid = list(puzzle)
+    row_keys = _line_keys(grid, True)
+    column_keys = _line_keys(grid, False)
+    best = None
+    for transposed in (False, True):
+        if transposed:
+            grid = [grid[(index % 9) * 9 + index // 9]
+                    for index in range(0, 81, 1)]
+            row_keys, column_keys = column_keys, row_keys
+        row_orders = _orders(grid, True, row_keys, MAX_ARRANGEMENTS // 2)
+        tree = {}
+        for order in row_orders:
+            node = tree
+            for row in order:
+                node = node.setdefault(row, {})
+        found = []
+        for columns in _orders(grid, False, column_keys,
+                               max(1, MAX_ARRANGEMENTS // 2
+                                   // len(row_orders))):
+            _smallest(grid, tree, columns, found)
+        canonical, rows, columns, labels = found
+        if best is not None and canonical >= best[0]:
+            continue
+        source = []
+        for row in rows:
+            for column in columns:
+                if transposed:
+                    source.append(column * 9 + row)
+                else:
+                    source.append(row * 9 + column)
+        digits = [""] * 10
+        for char, label in labels.items():
+            if char != ".":
+                digits[int(label)] = char
+        # Digits not given are labelled after those that are
+        missing = [digit for digit in "123456789" if digit not in labels]
+        for label in range(len(labels), 10, 1):
+            digits[label] = missing[label - len(labels)]
+        best = (canonical, (source, digits))
+    return best
+
+
+def restore(solution: str, transform: ()) -> str:
+    """
+    Function to map a solution of a canonical puzzle back to the original.
+    @param solution:    The 81 digits of the canonical solution
+    @type solution:     str
+    @param transform:   The transform returned by canonicalize()
+    @type transform:    Tuple[List[int], List[str]]
+    @return:    The 81 digits of the solution of the original puzzle
+    @rtype:     str
+    """
+    source, digits = transform
+    restored = [""] * 81
+    for index in range(0, 81, 1):
+        restored[source[index]] = digits[int(solution[index])]
+    return "".join(restored)
+
+
+def transform_solution(solution: str, transform: ()) -> str:
+    """
+    Function to map a solution of an original puzzle to its canonical form.
+    @param solution:    The 81 digits of the original solution
+    @type solution:     str
+    @param transform:   The transform returned by canonicalize()
+    @type transform:    Tuple[List[int], List[str]]
+    @return:    The 81 digits of the solution of the canonical puzzle
+    @rtype:     str
+    """
+    source, digits = transform
+    labels = {digit: str(label) for label, digit in enumerate(digits)
+              if digit}
+    return "".join([labels[solution[index]] for index in source])
+
+
+class SolutionCache:
+    """
+    SolutionCache object used to remember the solutions of recent puzzles.
+
+    Solutions are stored against the canonical form of their puzzle, so a
+    lookup costs one canonicalisation whichever symmetric variant is asked
+    for. Puzzles are also remembered exactly as they were given, so asking
+    for the same puzzle again (or storing the one just looked up) does not
+    canonicalise it again. Once full, the least recently used entry is
+    evicted.
+
+    Attributes:
+        _entries (OrderedDict[str, str]):   Canonical solution (or
+                                            NO_SOLUTION) by canonical puzzle,
+                                            least recently used first
+        _exact (OrderedDict[str, str]): Solution (or NO_SOLUTION) by puzzle
+                                        as given, least recently used first
+        _last (Tuple[str, str, Tuple]): The puzzle last canonicalised, its
+                                        canonical form and transform (None
+                                        if there is none)
+        _maxsize (int): The largest number of entries kept
+        _hits (int):    The number of lookups that found a solution
+        _misses (int):  The number of lookups that did not
+        _evictions (int):   The number of entries evicted to make room
+    """
+    _entries = None
+    _exact = None
+    _last = None
+    _maxsize = 0
+    _hits = 0
+    _misses = 0
+    _evictions = 0
+
+    def __init__(self, maxsize: int = 4096):
+        """
+        Constructor for an instance of an empty SolutionCache object.
+        @param maxsize: The largest number of entries to keep
+        @type maxsize:  int
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+        self._entries = OrderedDict()
+        self._exact = OrderedDict()
+        self._last = None
+        self._maxsize = maxsize
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, puzzle: str) -> str:
+        """
+        Operation for looking up the solution of a puzzle.
+        @param puzzle:  The puzzle as 81 characters
+        @type puzzle:   str
+        @return:    The 81 digits of the solution, NO_SOLUTION if the puzzle
+                    is known to have none, or None if it is not cached
+        @rtype:     str
+        """
+        puzzle = puzzle.strip().replace("0", ".")
+        solution = self._exact.get(puzzle)
+        if solution is not None:
+            self._hits += 1
+            self._exact.move_to_end(puzzle)
+            return solution
+        canonical, transform = self._canonicalize(puzzle)
+        solution = self._entries.get(canonical)
+        if solution is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._entries.move_to_end(canonical)
+        if solution != NO_SOLUTION:
+            solution = restore(solution, transform)
+        self._remember(puzzle, solution)
+        return solution
+
+    def put(self, puzzle: str, solution: str):
+        """
+        Operation for storing the solution of a puzzle.
+        @param puzzle:  The puzzle as 81 characters
+        @type puzzle:   str
+        @param solution:    The 81 digits of its solution (NO_SOLUTION if it
+                            has none)
+        @type solution:     str
+        """
+        puzzle = puzzle.strip().replace("0", ".")
+        self._remember(puzzle, solution)
+        canonical, transform = self._canonicalize(puzzle)
+        if solution != NO_SOLUTION:
+            solution = transform_solution(solution, transform)
+        self._entries[canonical] = solution
+        self._entries.move_to_end(canonical)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def _canonicalize(self, puzzle: str) -> ():
+        """
+        Operation to find the canonical form of a puzzle, reusing the last
+        one found if it was for the same puzzle (as when a lookup that
+        missed is followed by storing the solution).
+        @param puzzle:  The puzzle as 81 characters, using '.' for empty cells
+        @type puzzle:   str
+        @return:    The canonical puzzle and transform (see canonicalize())
+        @rtype:     Tuple[str, Tuple[List[int], List[str]]]
+        """
+        if self._last is None or self._last[0] != puzzle:
+            self._last = (puzzle,) + canonicalize(puzzle)
+        return self._last[1:]
+
+    def _remember(self, puzzle: str, solution: str):
+        """
+        Operation to store the solution of a puzzle exactly as it was given.
+        @param puzzle:  The puzzle as 81 characters, using '.' for empty cells
+        @type puzzle:   str
+        @param solution:    The 81 digits of its solution (NO_SOLUTION if it
+                            has none)
+        @type solution:     str
+        """
+        self._exact[puzzle] = solution
+        self._exact.move_to_end(puzzle)
+        while len(self._exact) > self._maxsize:
+            self._exact.popitem(last=False)
+
+    def clear(self):
+        """
+        Operation to remove every entry and reset the counters.
+        """
+        self._entries.clear()
+        self._exact.clear()
+        self._last = None
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get_maxsize(self) -> int:
+        """
+        Getter for the largest number of entries kept.
+        @return:    The size bound of this cache
+        @rtype:     int
+        """
+        return self._maxsize
+
+    def get_hits(self) -> int:
+        """
+        Getter for the number of lookups that found a solution.
+        @return:    The number of hits
+        @rtype:     int
+        """
+        return self._hits
+
+    def get_misses(self) -> int:
+        """
+        Getter for the number of lookups that did not find a solution.
+        @return:    The number of misses
+        @rtype:     int
+        """
+        return self._misses
+
+    def get_evictions(self) -> int:
+        """
+        Getter for the number of entries evicted to make room.
+        @return:    The number of evictions
+        @rtype:     int
+        """
+        return self._evictions
+
+    def __len__(self) -> int:
+        """
+        Operation for finding the number of entries cached.
+        @return:    The number of entries
+        @rtype:     int
+        """
+        return len(self._entries)
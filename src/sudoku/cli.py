@@ -0,0 +1,230 @@
+"""
+Command line interface for solving sudokus without the GUI.
+
+Puzzles are read one per line in the text format (see sudoku.formats, 81
+characters for a 9x9 board) from a file or stdin, and a result is written
+for each one as soon as it is available. Input is streamed, so files of any
+size are solved in constant memory. Blank lines and lines starting with '#' are
+skipped.
+
+A solution store (see sudoku.store) can be given to look puzzles up in
+before solving them, and with --update-store every puzzle newly solved is
+added to it in one bulk merge at the end of the run. Until then they wait in
+a temporary file rather than in memory.
+
+Usage:
+    python -m sudoku [input] [-o output] [--workers N] [--chunksize N]
+                     [--solver NAME] [--strategies NAME ...] [--timing]
+                     [--validate-only] [--store FILE [--update-store]]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from collections import deque
+
+from sudoku.batch import solve_many
+from sudoku.store import PUZZLE_SIZE, SolutionStore
+from sudoku.strategies import NAMES
+from sudoku.sudoku import SOLVERS
+from sudoku.validation import validate_many
+
+UNSOLVED = "unsolved"
+""" str:    The line written for a puzzle that cannot be solved.
+"""
+VALID = "valid"
+""" str:    The line written for a valid puzzle in --validate-only mode.
+"""
+INVALID = "invalid"
+""" str:    The line written for an invalid puzzle in --validate-only mode.
+"""
+
+
+def read_puzzles(stream):
+    """
+    Generator reading puzzles from a text stream one line at a time.
+    @param stream:  The stream to read from
+    @type stream:   TextIO
+    @return:    Each puzzle line with surrounding whitespace removed
+    @rtype:     Iterator[str]
+    """
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def _parse_args(argv: []) -> argparse.Namespace:
+    """
+    Function to read the command line arguments.
+    @param argv:    The arguments given (excluding the program name)
+    @type argv:     List[str]
+    @return:    The parsed arguments
+    @rtype:     argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m sudoku",
+        description="Solve sudokus given one per line as 81 characters (or "
+                    "16, 256 or 625 for other sizes), using '0' or '.' for "
+                    "empty cells.")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="file to read puzzles from ('-' for stdin, the "
+                             "default)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="file to write results to ('-' for stdout, the "
+                             "default)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of worker processes (default 1)")
+    parser.add_argument("--chunksize", type=int, default=64,
+                        help="puzzles sent to a worker at once (default 64)")
+    parser.add_argument("--solver", choices=SOLVERS, default="trail",
+                        help="search used when guessing (default trail)")
+    parser.add_argument("--strategies", nargs="*", choices=NAMES, default=(),
+                        help="logical strategies to run before guessing")
+    parser.add_argument("--timing", action="store_true",
+                        help="report the number of puzzles and the time "
+                             "taken on stderr")
+    parser.add_argument("--validate-only", action="store_true",
+                        help="only check each puzzle is well formed with no "
+                             "duplicate values, writing 'valid' or "
+                             "'invalid'")
+    parser.add_argument("--store",
+                        help="solution store file to look puzzles up in "
+                             "before solving them")
+    parser.add_argument("--update-store", action="store_true",
+                        help="add every puzzle newly solved to the store "
+                             "at the end of the run")
+    args = parser.parse_args(argv)
+    if args.update_store and not args.store:
+        parser.error("--update-store requires --store")
+    return args
+
+
+def _remember(puzzles, seen: deque):
+    """
+    Generator recording each puzzle as it is passed on to be solved.
+    @param puzzles: The puzzles being solved
+    @type puzzles:  Iterable[str]
+    @param seen:    The queue to append each puzzle to
+    @type seen:     Deque[str]
+    @return:    The puzzles, unchanged
+    @rtype:     Iterator[str]
+    """
+    for puzzle in puzzles:
+        seen.append(puzzle)
+        yield puzzle
+
+
+def _read_solved(stream):
+    """
+    Generator reading back the solved puzzles written to a temporary file.
+    @param stream:  The file holding a puzzle and its solution per line
+    @type stream:   TextIO
+    @return:    (puzzle, solution) pairs
+    @rtype:     Iterator[Tuple[str, str]]
+    """
+    stream.seek(0)
+    for line in stream:
+        puzzle, solution = line.split()
+        yield puzzle, solution
+
+
+def _open(path: str, mode: str, default):
+    """
+    Function to open a file given on the command line.
+    @param path:    The path of the file ('-' for the default stream)
+    @type path:     str
+    @param mode:    The mode to open the file with
+    @type mode:     str
+    @param default: The stream to use for '-'
+    @type default:  TextIO
+    @return:    The open stream
+    @rtype:     TextIO
+    """
+    if path == "-":
+        return default
+    return open(path, mode, encoding="ascii", errors="replace")
+
+
+def run(argv: []) -> int:
+    """
+    Function to run the command line solver.
+    @param argv:    The arguments given (excluding the program name)
+    @type argv:     List[str]
+    @return:    The exit status, 0 = every puzzle was solved (or valid),
+                1 = at least one puzzle was not
+    @rtype:     int
+    """
+    args = _parse_args(argv)
+    source = _open(args.input, "r", sys.stdin)
+    target = _open(args.output, "w", sys.stdout)
+    store = SolutionStore(args.store) if args.store else None
+    seen = deque()
+    solved = None
+    added = 0
+    count = 0
+    failures = 0
+    start = time.perf_counter()
+    try:
+        puzzles = read_puzzles(source)
+        if args.validate_only:
+            for conflicts in validate_many(puzzles):
+                count += 1
+                if conflicts == []:
+                    target.write(VALID + "\n")
+                else:
+                    failures += 1
+                    target.write(INVALID + "\n")
+        else:
+            if args.update_store:
+                puzzles = _remember(puzzles, seen)
+                solved = tempfile.TemporaryFile("w+", encoding="ascii")
+            for _, solution in solve_many(puzzles, workers=args.workers,
+                                          chunksize=args.chunksize,
+                                          solver=args.solver,
+                                          strategies=args.strategies,
+                                          store=store):
+                count += 1
+                if args.update_store:
+                    # Results come back in order, so match the oldest puzzle
+                    puzzle = seen.popleft()
+                    if solution is not None \
+                            and len(solution) == PUZZLE_SIZE \
+                            and puzzle not in store:
+                        solved.write(puzzle + " " + solution + "\n")
+                        added += 1
+                if solution is None:
+                    failures += 1
+                    target.write(UNSOLVED + "\n")
+                else:
+                    target.write(solution + "\n")
+        target.flush()
+        if added:
+            store.add_many(_read_solved(solved))
+    finally:
+        if solved is not None:
+            solved.close()
+        if store is not None:
+            store.close()
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+    if args.timing:
+        elapsed = time.perf_counter() - start
+        rate = count / elapsed if elapsed > 0 else 0.0
+        sys.stderr.write("%d puzzles (%d failed) in %.3fs, %.1f puzzles/s\n"
+                         % (count, failures, elapsed, rate))
+    return 1 if failures else 0
+
+
+def main():
+    """
+    Function to run if this module is executed - runs the command line solver
+    with the arguments given to the program.
+    """
+    sys.exit(run(sys.argv[1:]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Dancing Links (Knuth's Algorithm X) solver for a flat list of option masks.
+
+A sudoku is modelled as an exact cover problem with 4 * size * size
+constraints (every cell holds a value, and every row, column and square holds
+each value once) and size ** 3 candidates (one per value of every cell), each
+candidate satisfying exactly 4 constraints - 324 and 729 for a 9x9 board. The
+search always branches on the constraint with the fewest candidates left,
+which keeps its worst case far more predictable than guessing on cells.
+
+The links are held in flat lists of node numbers. Node 0 is the root, the
+next 4 * size * size nodes head each constraint's column and candidate c owns
+the 4 nodes starting at the first node after them + c * 4. The links of an
+empty problem are built once per board size and copied for each solve.
+"""
+import time
+
+from sudoku.backtrack import SolveCancelled, SolveTimeout
+from sudoku.layout import Layout, layout_of
+from sudoku.stats import SolveStats
+
+_LINKS = {}
+""" dict[int, Tuple[List[int]]]:    The links of an empty sudoku (see
+                                    _build_links()) by board size.
+"""
+
+
+def _candidate_columns(layout: Layout, candidate: int) -> ():
+    """
+    Function to list the constraint columns a candidate satisfies.
+    @param layout:  The tables of the board
+    @type layout:   Layout
+    @param candidate:   The candidate number (cell index * size + value - 1)
+    @type candidate:    int
+    @return:    The 4 column header nodes of the candidate
+    @rtype:     Tuple[int]
+    """
+    size = layout.size
+    index, digit = divmod(candidate, size)
+    square = layout.cell_units[index][2] - size * 2
+    return (1 + index, 1 + layout.cells + index // size * size + digit,
+            1 + layout.cells * 2 + index % size * size + digit,
+            1 + layout.cells * 3 + square * size + digit)
+
+
+def _build_links(layout: Layout) -> ():
+    """
+    Function to build the links of the exact cover matrix of an empty sudoku.
+    @param layout:  The tables of the board
+    @type layout:   Layout
+    @return:    The left, right, up, down, column and column size lists
+    @rtype:     Tuple[List[int]]
+    """
+    columns = layout.cells * 4
+    first_node = columns + 1
+    left = [column - 1 for column in range(0, first_node, 1)]
+    left[0] = columns
+    right = [column + 1 for column in range(0, first_node, 1)]
+    right[columns] = 0
+    up = list(range(0, first_node, 1))
+    down = list(range(0, first_node, 1))
+    column_of = list(range(0, first_node, 1))
+    sizes = [0] * first_node
+    for candidate in range(0, layout.cells * layout.size, 1):
+        first = first_node + candidate * 4
+        for offset, column in enumerate(_candidate_columns(layout,
+                                                           candidate)):
+            node = first + offset
+            left.append(first + (offset - 1) % 4)
+            right.append(first + (offset + 1) % 4)
+            up.append(up[column])
+            down.append(column)
+            down[up[column]] = node
+            up[column] = node
+            column_of.append(column)
+            sizes[column] += 1
+    return left, right, up, down, column_of, sizes
+
+
+def solve(cells: [], stats: SolveStats = None,
+          deadline: float = None, cancel=None) -> bool:
+    """
+    Function to solve a sudoku with Dancing Links.
+
+    Solved cells are taken as givens, and the options of unsolved cells limit
+    the candidates the search may use.
+    @param cells:   The flat, row-major list of option masks (replaced by
+                    the solution if one is found)
+    @type cells:    array[int]
+    @param stats:   The statistics to record the search on (None to not
+                    record anything)
+    @type stats:    SolveStats
+    @param deadline:    The time.monotonic() value to give up at, checked
+                        before every candidate is tried (None to search for
+                        as long as it takes)
+    @type deadline:     float
+    @param cancel:  The flag that stops the search once set, checked with the
+                    deadline (None for no flag)
+    @type cancel:   threading.Event
+    @return:    True = cells now holds a solution, False = no solution exists
+                (cells is left unchanged)
+    @rtype:     bool
+    @raise SolveTimeout:    The deadline passed (cells is left unchanged)
+    @raise SolveCancelled:  The cancel flag was set (cells is left unchanged)
+    """
+    layout = layout_of(cells)
+    size = layout.size
+    first_node = layout.cells * 4 + 1
+    if size not in _LINKS:
+        _LINKS[size] = _build_links(layout)
+    left, right, up, down, column_of, sizes = [links.copy()
+                                               for links in _LINKS[size]]
+
+    def cover(column: int):
+        right[left[column]] = right[column]
+        left[right[column]] = left[column]
+        row = down[column]
+        while row != column:
+            node = right[row]
+            while node != row:
+                up[down[node]] = up[node]
+                down[up[node]] = down[node]
+                sizes[column_of[node]] -= 1
+                node = right[node]
+            row = down[row]
+
+    def uncover(column: int):
+        row = up[column]
+        while row != column:
+            node = left[row]
+            while node != row:
+                sizes[column_of[node]] += 1
+                up[down[node]] = node
+                down[up[node]] = node
+                node = left[node]
+            row = up[row]
+        right[left[column]] = column
+        left[right[column]] = column
+
+    # Remove the candidates of values unsolved cells cannot take, before any
+    # column is covered so every candidate is still linked
+    for index in range(0, layout.cells, 1):
+        mask = cells[index]
+        if mask == 0:
+            return False
+        if mask & (mask - 1):
+            for digit in range(0, size, 1):
+                if not mask & (1 << digit):
+                    first = first_node + (index * size + digit) * 4
+                    for node in range(first, first + 4, 1):
+                        up[down[node]] = up[node]
+                        down[up[node]] = down[node]
+                        sizes[column_of[node]] -= 1
+
+    # Select the candidate of every given unless one of its constraints has
+    # already been taken by another given
+    chosen = []
+    covered = [False] * first_node
+    for index in range(0, layout.cells, 1):
+        mask = cells[index]
+        if mask & (mask - 1) == 0:
+            candidate = index * size + mask.bit_length() - 1
+            columns = _candidate_columns(layout, candidate)
+            for column in columns:
+                if covered[column]:
+                    return False
+            for column in columns:
+                covered[column] = True
+                cover(column)
+            chosen.append(candidate)
+
+    def search() -> bool:
+        column = right[0]
+        if column == 0:
+            return True
+        # Branch on the constraint with the fewest candidates
+        best = column
+        fewest = sizes[column]
+        while column and fewest > 1:
+            if sizes[column] < fewest:
+                best = column
+                fewest = sizes[column]
+            column = right[column]
+        if fewest == 0:
+            return False
+        cover(best)
+        row = down[best]
+        while row != best:
+            if deadline is not None and time.monotonic() > deadline:
+                raise SolveTimeout()
+            if cancel is not None and cancel.is_set():
+                raise SolveCancelled()
+            candidate = (row - first_node) // 4
+            chosen.append(candidate)
+            if stats is not None:
+                stats.guess(candidate // size, candidate % size + 1)
+            node = right[row]
+            while node != row:
+                cover(column_of[node])
+                node = right[node]
+            if search():
+                return True
+            if stats is not None:
+                stats.backtrack(candidate // size, candidate % size + 1)
+            node = left[row]
+            while node != row:
+                uncover(column_of[node])
+                node = left[node]
+            chosen.pop()
+            row = down[row]
+        uncover(best)
+        return False
+
+    if not search():
+        return False
+    for candidate in chosen:
+        index, digit = divmod(candidate, size)
+        cells[index] = 1 << digit
+    return True
@@ -0,0 +1,165 @@
+"""
+Conversion between flat lists of option masks and the common text format.
+
+A sudoku is written as one character per cell in row-major order (81 for a
+9x9 board), each being the symbol of a solved cell or '0' / '.' for an empty
+one. Values 1 to 9 are written as digits and larger values, used on 16x16
+and 25x25 boards, as the letters 'A' (10) to 'P' (25). The size of the board
+is taken from the number of characters. This is also the format used to pass
+sudokus between processes, so no Box or Sudoku objects are pickled.
+"""
+from sudoku.layout import Layout, get_layout_by_size, layout_of
+
+SYMBOLS = "123456789ABCDEFGHIJKLMNOP"
+""" str:    The character written for each value, starting from 1.
+"""
+
+_MASK_TO_CHAR = {1 << value: symbol for value, symbol in enumerate(SYMBOLS)}
+""" dict[int, str]: The symbol written for each single option mask.
+"""
+_MASK_TO_VALUE = {1 << value: value + 1 for value in range(0, len(SYMBOLS), 1)}
+""" dict[int, int]: The value of each single option mask.
+"""
+_CHAR_TO_MASK = {}
+""" dict[int, dict[str, int]]:  The option mask each character of a puzzle
+                                stands for, by board size.
+"""
+_BYTE_TO_MASK = {}
+""" dict[int, List[int]]:   The option mask each byte of a puzzle stands for
+                            (None for bytes that are not allowed), by board
+                            size. Both ASCII symbols and raw values 0 to size
+                            are accepted.
+"""
+
+
+def _char_masks(layout: Layout) -> dict:
+    """
+    Function to find the mask of every character allowed on a board.
+    @param layout:  The tables of the board
+    @type layout:   Layout
+    @return:    The option mask of each character ('.' and '0' being empty
+                cells, and letters accepted in either case)
+    @rtype:     dict[str, int]
+    """
+    masks = _CHAR_TO_MASK.get(layout.size)
+    if masks is None:
+        masks = {".": layout.all_options, "0": layout.all_options}
+        for value, symbol in enumerate(SYMBOLS[:layout.size]):
+            masks[symbol] = 1 << value
+            masks[symbol.lower()] = 1 << value
+        _CHAR_TO_MASK[layout.size] = masks
+    return masks
+
+
+def _byte_masks(layout: Layout) -> []:
+    """
+    Function to find the mask of every byte allowed on a board.
+    @param layout:  The tables of the board
+    @type layout:   Layout
+    @return:    The option mask of each byte (None for bytes not allowed)
+    @rtype:     List[int]
+    """
+    masks = _BYTE_TO_MASK.get(layout.size)
+    if masks is None:
+        masks = [None] * 256
+        for char, mask in _char_masks(layout).items():
+            masks[ord(char)] = mask
+        masks[0] = layout.all_options
+        for value in range(1, layout.size + 1, 1):
+            masks[value] = 1 << (value - 1)
+        _BYTE_TO_MASK[layout.size] = masks
+    return masks
+
+
+def parse_grid(text: str) -> []:
+    """
+    Function to read a sudoku written as a string of one character per cell.
+
+    Surrounding whitespace is ignored.
+    @param text:    The sudoku, symbols for solved cells and '0' or '.' for
+                    empty ones
+    @type text:     str
+    @return:    The flat, row-major list of option masks
+    @rtype:     array[int]
+    @raise ValueError:  The text is not a supported number of valid
+                        characters long
+    """
+    text = text.strip()
+    masks = _char_masks(layout_of(text))
+    try:
+        return [masks[char] for char in text]
+    except KeyError as error:
+        raise ValueError("'" + error.args[0]
+                         + "' is not a value or an empty cell.") from None
+
+
+def parse_bytes(data: bytes) -> []:
+    """
+    Function to read a sudoku given as one byte per cell.
+
+    Each byte is either an ASCII symbol / '.' or a raw value between 0 and
+    the board size, 0 being an empty cell.
+    @param data:    The sudoku to read
+    @type data:     bytes
+    @return:    The flat, row-major list of option masks
+    @rtype:     array[int]
+    @raise ValueError:  The data is not a supported number of valid bytes
+                        long
+    """
+    masks = _byte_masks(layout_of(data))
+    cells = [masks[byte] for byte in data]
+    if None in cells:
+        raise ValueError("'" + str(data[cells.index(None)])
+                         + "' is not a value or an empty cell.")
+    return cells
+
+
+def parse_rows(rows: []) -> []:
+    """
+    Function to read a sudoku given as a list of rows.
+    @param rows:    size rows of size values, 0 or None being an empty cell
+    @type rows:     List[List[int]]
+    @return:    The flat, row-major list of option masks
+    @rtype:     array[int]
+    @raise ValueError:  The rows are not square, not a supported size or hold
+                        values outside 0 to size
+    """
+    layout = get_layout_by_size(len(rows))
+    if any(len(row) != layout.size for row in rows):
+        raise ValueError("A sudoku must have " + str(layout.size)
+                         + " rows of " + str(layout.size) + " cells.")
+    cells = []
+    for row in rows:
+        for value in row:
+            if not value:
+                cells.append(layout.all_options)
+            elif 1 <= value <= layout.size:
+                cells.append(1 << (value - 1))
+            else:
+                raise ValueError("'" + str(value)
+                                 + "' is not a value or an empty cell.")
+    return cells
+
+
+def format_grid(cells: []) -> str:
+    """
+    Function to write a sudoku as a string of one character per cell.
+    @param cells:   The flat, row-major list of option masks
+    @type cells:    array[int]
+    @return:    The symbol of every solved cell, '.' for unsolved cells
+    @rtype:     str
+    """
+    return "".join([_MASK_TO_CHAR.get(mask, ".") for mask in cells])
+
+
+def format_rows(cells: []) -> []:
+    """
+    Function to write a sudoku as a list of rows.
+    @param cells:   The flat, row-major list of option masks
+    @type cells:    array[int]
+    @return:    size rows of size values, 0 for unsolved cells
+    @rtype:     List[List[int]]
+    """
+    size = layout_of(cells).size
+    values = [_MASK_TO_VALUE.get(mask, 0) for mask in cells]
+    return [values[y * size:y * size + size] for y in range(0, size, 1)]
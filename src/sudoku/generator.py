@@ -0,0 +1,374 @@
+"""
+Generating random sudokus with a unique solution, graded by difficulty.
+
+A complete grid is made by filling the squares on the diagonal (which share
+no unit) with shuffled values, completing the rest with the search (see
+sudoku.backtrack) and relabelling the values at random. Clues are then
+removed in a random order, each removal being kept only if the solution
+stays unique. As the puzzle is unique before a clue is removed, any other
+solution must put a different value in the emptied cell, so uniqueness is
+checked with one search for a solution avoiding the old value rather than
+counting solutions.
+
+A puzzle is graded by solving it with every logical strategy (see
+sudoku.strategies): "easy" puzzles need nothing beyond propagation, "medium"
+and "hard" ones need the cheaper and dearer strategies and "expert" ones
+still need guesses. Generating is spread over a pool of worker processes
+as batch solving is (see sudoku.batch).
+
+A grade is asked for by throwing away candidates of any other grade, so how
+long that takes depends on how common the grade is. On 9x9 boards about two
+in three candidates are "easy", one in four "expert", one in ten "medium"
+and only about one in 300-500 "hard" (tens of seconds per puzzle per
+worker). 4x4 boards only ever give "easy" puzzles, and 16x16 candidates take
+tens of seconds each and are almost always "expert". Each puzzle is given up
+on after MAX_ATTEMPTS candidates, raising ValueError, rather than searching
+forever for a grade the board size cannot (or can rarely) give.
+
+Usage:
+    python -m sudoku.generator [count] [--size N] [--difficulty NAME]
+                               [--workers N] [--chunksize N] [--seed N]
+                               [--max-attempts N] [--asymmetric] [--grades]
+"""
+import argparse
+import os
+import random
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from sudoku.backtrack import search
+from sudoku.formats import format_grid
+from sudoku.layout import get_layout, get_layout_by_size, layout_of
+from sudoku.propagation import propagate_all
+from sudoku.stats import SolveStats
+from sudoku.strategies import NAMES, select
+
+DIFFICULTIES = ("easy", "medium", "hard", "expert")
+""" Tuple[str]: The grades given to puzzles, easiest first.
+"""
+_STRATEGY_LEVELS = {"naked_pairs": 1, "pointing": 1, "box_line": 1,
+                    "hidden_pairs": 1, "naked_triples": 2, "x_wing": 2,
+                    "hidden_triples": 2}
+""" dict[str, int]: The grade (as an index into DIFFICULTIES) of a puzzle
+                    needing each strategy.
+"""
+_ALL_STRATEGIES = select(NAMES)
+""" Tuple[Tuple[str, Callable]]:    Every strategy, used to grade puzzles.
+"""
+MAX_ATTEMPTS = 1000
+""" int:    The number of candidates made for one puzzle of the grade wanted
+            before giving up.
+"""
+
+
+def random_grid(block: int = 3, rng: random.Random = None) -> []:
+    """
+    Function to build a random, completely solved sudoku.
+    @param block:   The width of a square, in cells (see sudoku.layout)
+    @type block:    int
+    @param rng:     The random number generator to use (None for the random
+                    module's own)
+    @type rng:      random.Random
+    @return:    The flat list of single option masks
+    @rtype:     List[int]
+    @raise ValueError:  The block size is not supported
+    """
+    if rng is None:
+        rng = random
+    layout = get_layout(block)
+    size = layout.size
+    values = [1 << value for value in range(0, size, 1)]
+    while True:
+        cells = [layout.all_options] * layout.cells
+        for square in range(0, block, 1):
+            # The squares on the diagonal share no row, column or square
+            unit = layout.units[size * 2 + square * (block + 1)]
+            for index, mask in zip(unit, rng.sample(values, size)):
+                cells[index] = mask
+        if propagate_all(cells) and search(cells, []):
+            break
+    relabel = dict(zip(values, rng.sample(values, size)))
+    return [relabel[mask] for mask in cells]
+
+
+def _stays_unique(puzzle: [], solution: [], index: int,
+                  all_options: int) -> bool:
+    """
+    Function to check a unique puzzle stays unique with one more cell empty.
+    @param puzzle:  The flat list of option masks of the puzzle, the cell
+                    already emptied (not changed)
+    @type puzzle:   List[int]
+    @param solution:    The flat list of masks of its solution
+    @type solution:     List[int]
+    @param index:   The index of the cell emptied
+    @type index:    int
+    @param all_options: The mask holding every value of the board
+    @type all_options:  int
+    @return:    True = the solution is still unique, False = another exists
+    @rtype:     bool
+    """
+    cells = list(puzzle)
+    cells[index] = all_options & ~solution[index]
+    return not (propagate_all(cells) and search(cells, []))
+
+
+def remove_clues(solution: [], rng: random.Random = None,
+                 symmetric: bool = True) -> []:
+    """
+    Function to empty as many cells of a solved sudoku as possible while
+    keeping its solution unique.
+    @param solution:    The flat list of masks of the solved sudoku
+    @type solution:     List[int]
+    @param rng:     The random number generator to use (None for the random
+                    module's own)
+    @type rng:      random.Random
+    @param symmetric:   True = empty cells in pairs opposite each other
+                        through the centre, False = empty single cells
+    @type symmetric:    bool
+    @return:    The flat list of option masks of the puzzle, every emptied
+                cell holding all options
+    @rtype:     List[int]
+    """
+    if rng is None:
+        rng = random
+    all_options = layout_of(solution).all_options
+    puzzle = list(solution)
+    last = len(puzzle) - 1
+    order = list(range(0, len(puzzle), 1))
+    rng.shuffle(order)
+    for index in order:
+        if puzzle[index] == all_options:
+            continue
+        group = (index, last - index) if symmetric else (index,)
+        emptied = []
+        for cell in group:
+            if puzzle[cell] == all_options:
+                continue
+            puzzle[cell] = all_options
+            emptied.append(cell)
+            if not _stays_unique(puzzle, solution, cell, all_options):
+                for restore in emptied:
+                    puzzle[restore] = solution[restore]
+                break
+    return puzzle
+
+
+def grade(puzzle: []) -> ():
+    """
+    Function to rate how hard a puzzle is to solve.
+    @param puzzle:  The flat list of option masks of the puzzle (not changed)
+    @type puzzle:   List[int]
+    @return:    The grade (see DIFFICULTIES) and the statistics of solving it
+                with every strategy, which count the strategies used and the
+                guesses made
+    @rtype:     Tuple[str, SolveStats]
+    @raise ValueError:  The puzzle has no solution
+    """
+    stats = SolveStats()
+    stats.width = layout_of(puzzle).size
+    cells = list(puzzle)
+    trail = []
+    consistent = propagate_all(cells, trail)
+    stats.propagated(len(trail) // 2)
+    if not (consistent and search(cells, [], stats, _ALL_STRATEGIES)):
+        raise ValueError("The puzzle has no solution.")
+    if stats.guesses:
+        return DIFFICULTIES[-1], stats
+    level = max((_STRATEGY_LEVELS[name] for name in stats.strategies),
+                default=0)
+    return DIFFICULTIES[level], stats
+
+
+def generate(block: int = 3, difficulty: str = None,
+             rng: random.Random = None, symmetric: bool = True,
+             max_attempts: int = MAX_ATTEMPTS) -> ():
+    """
+    Function to generate one graded puzzle with a unique solution.
+    @param block:   The width of a square, in cells (see sudoku.layout)
+    @type block:    int
+    @param difficulty:  The grade wanted (see DIFFICULTIES), puzzles of any
+                        other grade being thrown away (None for any grade)
+    @type difficulty:   str
+    @param rng:     The random number generator to use (None for the random
+                    module's own)
+    @type rng:      random.Random
+    @param symmetric:   True = empty cells in pairs opposite each other
+                        through the centre, False = empty single cells
+    @type symmetric:    bool
+    @param max_attempts:    The number of candidates to make before giving
+                            up on the grade wanted
+    @type max_attempts:     int
+    @return:    The puzzle as a string of one character per cell (see
+                sudoku.formats) and its grade
+    @rtype:     Tuple[str, str]
+    @raise ValueError:  The block size or difficulty is not supported, or no
+                        puzzle of the grade wanted was made in max_attempts
+                        candidates
+    """
+    if difficulty is not None and difficulty not in DIFFICULTIES:
+        raise ValueError("Unknown difficulty '" + str(difficulty) + "'.")
+    if max_attempts < 1:
+        raise ValueError("max_attempts must be at least 1.")
+    for _ in range(0, max_attempts, 1):
+        puzzle = remove_clues(random_grid(block, rng), rng, symmetric)
+        found, _ = grade(puzzle)
+        if difficulty is None or found == difficulty:
+            return format_grid(puzzle), found
+    raise ValueError("No " + difficulty + " puzzle was made in "
+                     + str(max_attempts) + " attempts on a "
+                     + str(block * block) + "x" + str(block * block)
+                     + " board.")
+
+
+def _generate_chunk(count: int, block: int, difficulty: str,
+                    symmetric: bool, seed: int, max_attempts: int) -> []:
+    """
+    Function run by a worker process to generate one chunk of puzzles.
+    @param count:   The number of puzzles to generate
+    @type count:    int
+    @param block:   The width of a square, in cells
+    @type block:    int
+    @param difficulty:  The grade wanted (None for any grade)
+    @type difficulty:   str
+    @param symmetric:   Whether cells are emptied in symmetric pairs
+    @type symmetric:    bool
+    @param seed:    The seed of the chunk's random number generator (None to
+                    seed it from the operating system)
+    @type seed:     int
+    @param max_attempts:    The number of candidates to make per puzzle
+                            before giving up
+    @type max_attempts:     int
+    @return:    The (puzzle, grade) pairs generated
+    @rtype:     List[Tuple[str, str]]
+    @raise ValueError:  No puzzle of the grade wanted was made in time
+    """
+    rng = random.Random(seed)
+    return [generate(block, difficulty, rng, symmetric, max_attempts)
+            for _ in range(0, count, 1)]
+
+
+def generate_many(count: int, workers: int = None, chunksize: int = 16,
+                  block: int = 3, difficulty: str = None,
+                  symmetric: bool = True, seed: int = None,
+                  max_attempts: int = MAX_ATTEMPTS):
+    """
+    Generator making many graded puzzles in parallel.
+
+    Each chunk is generated by a worker with its own random number
+    generator, seeded from the seed given, so a seed always gives the same
+    puzzles in the same order whatever the number of workers.
+    @param count:   The number of puzzles to generate
+    @type count:    int
+    @param workers: The number of worker processes (defaults to the number
+                    of CPUs, 1 generates in this process without a pool)
+    @type workers:  int
+    @param chunksize:   The number of puzzles a worker generates at once
+    @type chunksize:    int
+    @param block:   The width of a square, in cells (see sudoku.layout)
+    @type block:    int
+    @param difficulty:  The grade wanted (see DIFFICULTIES, None for any
+                        grade)
+    @type difficulty:   str
+    @param symmetric:   True = empty cells in pairs opposite each other
+                        through the centre, False = empty single cells
+    @type symmetric:    bool
+    @param seed:    The seed to derive every chunk's seed from (None for
+                    different puzzles every run)
+    @type seed:     int
+    @param max_attempts:    The number of candidates to make per puzzle
+                            before giving up on the grade wanted
+    @type max_attempts:     int
+    @return:    (puzzle, grade) pairs (see generate())
+    @rtype:     Iterator[Tuple[str, str]]
+    @raise ValueError:  An argument is out of range, or no puzzle of the
+                        grade wanted was made in max_attempts candidates
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1 or chunksize < 1 or max_attempts < 1:
+        raise ValueError("workers, chunksize and max_attempts must be at "
+                         "least 1.")
+    if difficulty is not None and difficulty not in DIFFICULTIES:
+        raise ValueError("Unknown difficulty '" + str(difficulty) + "'.")
+    get_layout(block)
+    seeds = random.Random(seed)
+    chunks = ((min(chunksize, count - start),
+               None if seed is None else seeds.getrandbits(64))
+              for start in range(0, count, chunksize))
+    if workers == 1:
+        for size, chunk_seed in chunks:
+            yield from _generate_chunk(size, block, difficulty, symmetric,
+                                       chunk_seed, max_attempts)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for size, chunk_seed in islice(chunks, workers * 2):
+            pending.append(executor.submit(_generate_chunk, size, block,
+                                           difficulty, symmetric, chunk_seed,
+                                           max_attempts))
+        try:
+            while pending:
+                yield from pending.popleft().result()
+                for size, chunk_seed in islice(chunks, 1):
+                    pending.append(executor.submit(
+                        _generate_chunk, size, block, difficulty, symmetric,
+                        chunk_seed, max_attempts))
+        finally:
+            # Chunks not started yet are not waited for after an error or
+            # once the caller stops reading
+            for future in pending:
+                future.cancel()
+
+
+def main():
+    """
+    Function to run if this module is executed - writes graded puzzles to
+    stdout, one per line, with the arguments given to the program.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m sudoku.generator",
+        description="Generate sudokus with a unique solution, one per line.")
+    parser.add_argument("count", type=int, nargs="?", default=1,
+                        help="number of puzzles to generate (default 1)")
+    parser.add_argument("--size", type=int, default=9,
+                        help="width of the board: 4, 9, 16 or 25 (default 9)")
+    parser.add_argument("--difficulty", choices=DIFFICULTIES, default=None,
+                        help="only write puzzles of this grade")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: CPUs)")
+    parser.add_argument("--chunksize", type=int, default=16,
+                        help="puzzles generated by a worker at once "
+                             "(default 16)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed giving the same puzzles every run")
+    parser.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS,
+                        help="candidates made per puzzle before giving up "
+                             "on the difficulty (default 1000)")
+    parser.add_argument("--asymmetric", action="store_true",
+                        help="empty single cells rather than symmetric pairs")
+    parser.add_argument("--grades", action="store_true",
+                        help="write the grade after each puzzle")
+    args = parser.parse_args(sys.argv[1:])
+    try:
+        block = get_layout_by_size(args.size).block
+    except ValueError as error:
+        parser.error(str(error))
+    try:
+        for puzzle, found in generate_many(args.count, args.workers,
+                                           args.chunksize, block,
+                                           args.difficulty,
+                                           not args.asymmetric, args.seed,
+                                           args.max_attempts):
+            sys.stdout.write(puzzle + (" " + found if args.grades else "")
+                             + "\n")
+    except ValueError as error:
+        sys.stdout.flush()
+        parser.error(str(error))
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Lookup tables describing the cells and units of each size of sudoku board.
+
+A board is made of block x block squares, each holding block x block cells,
+so it is size = block * block cells wide and every row, column and square
+holds the values 1 to size once. The classic sudoku has a block of 3; blocks
+of 2, 4 and 5 give 4x4, 16x16 and 25x25 boards.
+
+The tables of a size are built the first time it is asked for and shared
+from then on, and the functions working on a flat list of option masks find
+them from the length of the list with layout_of().
+"""
+from sudoku.bitmask import all_options
+
+BLOCKS = (2, 3, 4, 5)
+""" Tuple[int]: The block sizes supported (giving 4x4, 9x9, 16x16 and 25x25
+                boards).
+"""
+
+_LAYOUTS = {}
+""" dict[int, Layout]:  The tables built so far, by block size.
+"""
+_BY_CELLS = {}
+""" dict[int, Layout]:  The tables built so far, by number of cells.
+"""
+
+
+class Layout:
+    """
+    Layout object holding the lookup tables of one size of sudoku board.
+
+    Cells are numbered in row-major order, the cell at coordinates (x, y)
+    being number y * size + x.
+
+    Attributes:
+        block (int):    The width of a square, in cells
+        size (int):     The width of the board, and the number of values
+        cells (int):    The number of cells on the board
+        all_options (int):  The mask holding every value between 1 and size
+        units (Tuple[Tuple[int]]):  The cell indexes of every row (units 0 to
+                                    size - 1), column (size to 2 * size - 1)
+                                    and square (2 * size to 3 * size - 1)
+        cell_units (Tuple[Tuple[int]]): The row, column and square (as
+                                        indexes into units) of each cell
+        peers (Tuple[Tuple[int]]):  The cells sharing a unit with each cell
+    """
+    block = 3
+    size = 9
+    cells = 81
+    all_options = 0
+    units = ()
+    cell_units = ()
+    peers = ()
+
+    def __init__(self, block: int):
+        """
+        Constructor for an instance of the Layout object, building every
+        table for boards with squares of the width given.
+        @param block:   The width of a square, in cells
+        @type block:    int
+        """
+        size = block * block
+        self.block = block
+        self.size = size
+        self.cells = size * size
+        self.all_options = all_options(size)
+        units = []
+        for y in range(0, size, 1):
+            units.append(tuple(y * size + x for x in range(0, size, 1)))
+        for x in range(0, size, 1):
+            units.append(tuple(y * size + x for y in range(0, size, 1)))
+        for square_y in range(0, size, block):
+            for square_x in range(0, size, block):
+                units.append(tuple(
+                    y * size + x
+                    for y in range(square_y, square_y + block, 1)
+                    for x in range(square_x, square_x + block, 1)))
+        self.units = tuple(units)
+        self.cell_units = tuple(
+            (index // size, size + index % size,
+             size * 2 + (index // size // block) * block
+             + index % size // block)
+            for index in range(0, self.cells, 1))
+        self.peers = tuple(
+            tuple(sorted({peer for unit in self.cell_units[index]
+                          for peer in self.units[unit]} - {index}))
+            for index in range(0, self.cells, 1))
+
+
+def get_layout(block: int = 3) -> Layout:
+    """
+    Function to find the tables of a board size, building them if needed.
+    @param block:   The width of a square, in cells (see BLOCKS)
+    @type block:    int
+    @return:    The tables of the board
+    @rtype:     Layout
+    @raise ValueError:  The block size is not supported
+    """
+    layout = _LAYOUTS.get(block)
+    if layout is None:
+        if block not in BLOCKS:
+            raise ValueError("Squares of width " + str(block)
+                             + " are not supported.")
+        layout = Layout(block)
+        _LAYOUTS[block] = layout
+        _BY_CELLS[layout.cells] = layout
+    return layout
+
+
+def get_layout_by_size(size: int) -> Layout:
+    """
+    Function to find the tables of a board from its width.
+    @param size:    The width of the board, in cells
+    @type size:     int
+    @return:    The tables of the board
+    @rtype:     Layout
+    @raise ValueError:  The size is not a supported board width
+    """
+    for block in BLOCKS:
+        if block * block == size:
+            return get_layout(block)
+    widths = [str(block * block) for block in BLOCKS]
+    raise ValueError("A sudoku must be " + ", ".join(widths[:-1]) + " or "
+                     + widths[-1] + " cells wide, not " + str(size) + ".")
+
+
+def layout_of(cells: []) -> Layout:
+    """
+    Function to find the tables of a board from its flat list of masks.
+    @param cells:   The flat, row-major list of option masks
+    @type cells:    array[int]
+    @return:    The tables of the board
+    @rtype:     Layout
+    @raise ValueError:  The number of cells is not a supported board size
+    """
+    layout = _BY_CELLS.get(len(cells))
+    if layout is None:
+        for block in BLOCKS:
+            if block ** 4 == len(cells):
+                return get_layout(block)
+        counts = [str(block ** 4) for block in BLOCKS]
+        raise ValueError("A sudoku must have " + ", ".join(counts[:-1])
+                         + " or " + counts[-1] + " cells, not "
+                         + str(len(cells)) + ".")
+    return layout
@@ -0,0 +1,197 @@
+"""
+Constraint propagation over a flat, row-major list of option masks.
+
+The units (rows, columns and squares) and the peers of every cell are worked
+out once per board size (see sudoku.layout), so the same code solves 4x4, 9x9,
+16x16 and 25x25 boards. Solving a cell then only pushes eliminations to its
+peers through a work queue rather than sweeping the whole grid, and any unit
+touched by an elimination is checked for hidden singles (a value that only one
+cell of the unit can take).
+
+Every function that changes a mask can record the old mask on a trail (a flat
+list of index, mask pairs) so a search can roll the sudoku back with undo()
+instead of copying it before each guess.
+"""
+from sudoku.layout import get_layout, layout_of
+
+_CLASSIC = get_layout(3)
+""" Layout: The tables of the classic 9x9 board.
+"""
+UNITS = _CLASSIC.units
+""" Tuple[Tuple[int]]:  The cell indexes of every row, column and 3x3 square
+                        of a 9x9 board.
+"""
+CELL_UNITS = _CLASSIC.cell_units
+""" Tuple[Tuple[int]]:  The 3 units (as indexes into UNITS) each cell of a
+                        9x9 board is in.
+"""
+PEERS = _CLASSIC.peers
+""" Tuple[Tuple[int]]:  The 20 cells sharing a unit with each cell of a 9x9
+                        board.
+"""
+
+
+def is_consistent(cells: []) -> bool:
+    """
+    Function to check no two solved cells of a sudoku share a unit and value.
+
+    Stops at the first repeated value, see sudoku.validation.find_conflicts()
+    for finding every one.
+    @param cells:   The flat list of option masks
+    @type cells:    array[int]
+    @return:    True = every unit holds each value at most once, False = a
+                value is duplicated within a unit
+    @rtype:     bool
+    """
+    layout = layout_of(cells)
+    cell_units = layout.cell_units
+    seen = [0] * len(layout.units)
+    for index in range(0, layout.cells, 1):
+        mask = cells[index]
+        if mask == 0 or mask & (mask - 1):
+            continue
+        row, column, square = cell_units[index]
+        if (seen[row] | seen[column] | seen[square]) & mask:
+            return False
+        seen[row] |= mask
+        seen[column] |= mask
+        seen[square] |= mask
+    return True
+
+
+def propagate(cells: [], queue: [], dirty: set = None,
+              trail: [] = None) -> bool:
+    """
+    Function to push the consequences of newly solved cells through a sudoku.
+
+    Each solved cell taken from the queue has its value removed from all of
+    its peers, and any peer left with a single option is queued in turn. Once
+    the queue is empty every unit that has changed is checked for hidden
+    singles, which are solved and queued, until nothing changes.
+    @param cells:   The flat list of option masks, changed in place
+    @type cells:    array[int]
+    @param queue:   The indexes of solved cells whose value has not yet been
+                    removed from their peers
+    @type queue:    array[int]
+    @param dirty:   The units (as indexes into Layout.units) to check for
+                    hidden singles even if no elimination touches them
+    @type dirty:    set[int]
+    @param trail:   The undo trail to record every changed mask on (nothing
+                    is recorded if None)
+    @type trail:    array[int]
+    @return:    True = no contradiction found, False = a cell has been left
+                with no options or a value has nowhere left to go in a unit
+    @rtype:     bool
+    """
+    layout = layout_of(cells)
+    units = layout.units
+    cell_units = layout.cell_units
+    peers = layout.peers
+    full = layout.all_options
+    if dirty is None:
+        dirty = set()
+    while True:
+        while queue:
+            index = queue.pop()
+            bit = cells[index]
+            for peer in peers[index]:
+                mask = cells[peer]
+                if mask & bit:
+                    mask &= ~bit
+                    if mask == 0:
+                        return False
+                    if trail is not None:
+                        trail.append(peer)
+                        trail.append(cells[peer])
+                    cells[peer] = mask
+                    if mask & (mask - 1) == 0:
+                        queue.append(peer)
+                    dirty.update(cell_units[peer])
+        if not dirty:
+            return True
+        changed, dirty = dirty, set()
+        for unit in changed:
+            # Find the values that appear in exactly one cell of the unit
+            once = 0
+            twice = 0
+            for index in units[unit]:
+                mask = cells[index]
+                twice |= once & mask
+                once |= mask
+            if once != full:
+                return False
+            hidden = once & ~twice
+            if hidden:
+                for index in units[unit]:
+                    mask = cells[index]
+                    single = mask & hidden
+                    if single and single != mask:
+                        if single & (single - 1):
+                            # Two values can only go in this one cell
+                            return False
+                        if trail is not None:
+                            trail.append(index)
+                            trail.append(mask)
+                        cells[index] = single
+                        queue.append(index)
+                        dirty.update(cell_units[index])
+
+
+def assign(cells: [], index: int, bit: int, trail: [] = None) -> bool:
+    """
+    Function to solve one cell and propagate the consequences.
+    @param cells:   The flat list of option masks, changed in place
+    @type cells:    array[int]
+    @param index:   The index of the cell to solve
+    @type index:    int
+    @param bit:     The single option mask of the value to give the cell
+    @type bit:      int
+    @param trail:   The undo trail to record every changed mask on (nothing
+                    is recorded if None)
+    @type trail:    array[int]
+    @return:    True = no contradiction found, False = the value cannot be
+                placed here
+    @rtype:     bool
+    """
+    if trail is not None:
+        trail.append(index)
+        trail.append(cells[index])
+    cells[index] = bit
+    return propagate(cells, [index], set(layout_of(cells).cell_units[index]),
+                     trail)
+
+
+def undo(cells: [], trail: [], mark: int):
+    """
+    Function to roll a sudoku back to an earlier point on its undo trail.
+    @param cells:   The flat list of option masks, changed in place
+    @type cells:    array[int]
+    @param trail:   The undo trail the changes were recorded on
+    @type trail:    array[int]
+    @param mark:    The length the trail had at the point to roll back to
+    @type mark:     int
+    """
+    while len(trail) > mark:
+        mask = trail.pop()
+        cells[trail.pop()] = mask
+
+
+def propagate_all(cells: [], trail: [] = None) -> bool:
+    """
+    Function to propagate every solved cell of a freshly loaded sudoku.
+    @param cells:   The flat list of option masks, changed in place
+    @type cells:    array[int]
+    @param trail:   The undo trail to record every changed mask on (nothing
+                    is recorded if None)
+    @type trail:    array[int]
+    @return:    True = no contradiction found, False = the sudoku cannot be
+                solved
+    @rtype:     bool
+    """
+    if 0 in cells:
+        return False
+    layout = layout_of(cells)
+    queue = [index for index in range(0, layout.cells, 1)
+             if cells[index] & (cells[index] - 1) == 0]
+    return propagate(cells, queue, set(range(0, len(layout.units), 1)),
+                     trail)
@@ -0,0 +1,551 @@
+"""
+Solving sudokus from asyncio code, with deadlines and backpressure.
+
+solve_async() runs one solve in the event loop's default executor. A
+SolverService runs many across a pool of worker processes: requests wait in
+a bounded queue, so callers are held back once it is full rather than
+piling up work, and a fixed number of consumers pass them on to the pool.
+
+Every request can be given a timeout. Time spent queued counts against it,
+a request whose deadline passes before it reaches a worker is never solved,
+and the searches check the deadline before every guess (see
+sudoku.backtrack.SolveTimeout) so a runaway search stops on its own. A
+request cancelled while queued is skipped, and one already running is
+stopped at its next guess: each consumer owns a flag in memory shared with
+the workers, which is set when its request is cancelled (or the service is
+closed) and checked by the search next to the deadline (see
+sudoku.backtrack.SolveCancelled). solve_async() does the same with a
+threading.Event.
+
+Run as a module, a JSON-lines server reads requests such as
+{"id": 1, "puzzle": "53..7....", "timeout": 0.5} from stdin and writes
+{"id": 1, "status": "solved", "solution": "534678912..."} to stdout as each
+one completes, the status being one of STATUSES.
+
+Usage:
+    python -m sudoku.service [--workers N] [--queue-size N] [--timeout S]
+                             [--solver NAME] [--strategies NAME ...]
+"""
+import argparse
+import asyncio
+import functools
+import json
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from sudoku.backtrack import SolveCancelled, SolveTimeout
+from sudoku.strategies import NAMES, select
+from sudoku.sudoku import SOLVERS, Sudoku
+
+SOLVED = "solved"
+""" str:    The status of a request that was solved.
+"""
+UNSOLVED = "unsolved"
+""" str:    The status of a request for a puzzle with no solution.
+"""
+INVALID = "invalid"
+""" str:    The status of a request for a malformed puzzle.
+"""
+TIMEOUT = "timeout"
+""" str:    The status of a request that ran out of time.
+"""
+STATUSES = (SOLVED, UNSOLVED, INVALID, TIMEOUT)
+""" Tuple[str]: Every status a request can finish with.
+"""
+CANCELLED = "cancelled"
+""" str:    The status a worker gives a request stopped because it was
+            cancelled (never seen by callers, whose futures are already
+            cancelled).
+"""
+_FLAGS = None
+""" multiprocessing.RawArray:   The cancel flags of the consumers of the
+                                service a worker process belongs to (see
+                                _init_worker()).
+"""
+
+
+class _SharedFlag:
+    """
+    _SharedFlag object used as the cancel flag of a search in a worker
+    process, reading one slot of the flags shared with the service.
+
+    Attributes:
+        _flags (multiprocessing.RawArray):  The flags shared with the service
+        _slot (int):    The index of the flag to read
+    """
+    _flags = None
+    _slot = 0
+
+    def __init__(self, flags, slot: int):
+        """
+        Constructor for an instance of the _SharedFlag object.
+        @param flags:   The flags shared with the service
+        @type flags:    multiprocessing.RawArray
+        @param slot:    The index of the flag to read
+        @type slot:     int
+        """
+        self._flags = flags
+        self._slot = slot
+
+    def is_set(self) -> bool:
+        """
+        Getter for whether the search has been cancelled.
+        @return:    True = stop searching, False = carry on
+        @rtype:     bool
+        """
+        return self._flags[self._slot] != 0
+
+
+def _init_worker(flags):
+    """
+    Function run once by each worker process of a SolverService as it
+    starts.
+    @param flags:   The cancel flags of the consumers of the service
+    @type flags:    multiprocessing.RawArray
+    """
+    global _FLAGS
+    _FLAGS = flags
+
+
+def _solve_task(puzzle: str, solver: str, strategies: (), timeout: float,
+                cancel=None) -> ():
+    """
+    Function run by a worker to solve one puzzle within a time limit.
+    @param puzzle:  The sudoku to solve (see sudoku.formats)
+    @type puzzle:   str
+    @param solver:  The name of the search to use (see Sudoku.solve())
+    @type solver:   str
+    @param strategies:  The names of the logical strategies to use
+    @type strategies:   Tuple[str]
+    @param timeout: The number of seconds to search for (None for no limit)
+    @type timeout:  float
+    @param cancel:  The flag that stops the search once set (None for no
+                    flag)
+    @type cancel:   threading.Event
+    @return:    The status of the request (see STATUSES and CANCELLED) and
+                the solution (None unless solved)
+    @rtype:     Tuple[str, str]
+    """
+    try:
+        sudoku = Sudoku.from_string(puzzle)
+    except ValueError:
+        return INVALID, None
+    try:
+        solved = sudoku.solve(solver, strategies=strategies, timeout=timeout,
+                              cancel=cancel)
+    except SolveTimeout:
+        return TIMEOUT, None
+    except SolveCancelled:
+        return CANCELLED, None
+    if solved:
+        return SOLVED, sudoku.to_string()
+    return UNSOLVED, None
+
+
+def _solve_shared(puzzle: str, solver: str, strategies: (), timeout: float,
+                  slot: int) -> ():
+    """
+    Function run by a worker process of a SolverService to solve one puzzle,
+    stopping early if the consumer that sent it sets its cancel flag.
+    @param puzzle:  The sudoku to solve (see sudoku.formats)
+    @type puzzle:   str
+    @param solver:  The name of the search to use (see Sudoku.solve())
+    @type solver:   str
+    @param strategies:  The names of the logical strategies to use
+    @type strategies:   Tuple[str]
+    @param timeout: The number of seconds to search for (None for no limit)
+    @type timeout:  float
+    @param slot:    The index of the cancel flag of the consumer
+    @type slot:     int
+    @return:    The status of the request and the solution (see
+                _solve_task())
+    @rtype:     Tuple[str, str]
+    """
+    return _solve_task(puzzle, solver, strategies, timeout,
+                       _SharedFlag(_FLAGS, slot))
+
+
+def _result(status: str, solution: str) -> str:
+    """
+    Function to turn the outcome of a request into what solve() returns.
+    @param status:  The status of the request (see STATUSES)
+    @type status:   str
+    @param solution:    The solution found (None unless solved)
+    @type solution:     str
+    @return:    The solution (None if the puzzle is malformed or has no
+                solution)
+    @rtype:     str
+    @raise asyncio.TimeoutError:    The request ran out of time
+    @raise asyncio.CancelledError:  The request was cancelled
+    """
+    if status == TIMEOUT:
+        raise asyncio.TimeoutError()
+    if status == CANCELLED:
+        raise asyncio.CancelledError()
+    return solution
+
+
+async def solve_async(puzzle: str, timeout: float = None,
+                      solver: str = "trail", strategies: () = ()) -> str:
+    """
+    Function to solve one sudoku without blocking the event loop.
+
+    The solve runs in the loop's default executor. If this coroutine is
+    cancelled (by asyncio.wait_for() for instance) the search is told to
+    stop, so the thread is not left running. Use a SolverService to solve
+    many at once across processes.
+    @param puzzle:  The sudoku to solve (see sudoku.formats)
+    @type puzzle:   str
+    @param timeout: The number of seconds to search for (None for no limit)
+    @type timeout:  float
+    @param solver:  The name of the search to use (see Sudoku.solve())
+    @type solver:   str
+    @param strategies:  The names of the logical strategies to use (see
+                        Sudoku.solve())
+    @type strategies:   Iterable[str]
+    @return:    The solution (None if the puzzle is malformed or has no
+                solution)
+    @rtype:     str
+    @raise asyncio.TimeoutError:    The search ran out of time
+    """
+    if solver not in SOLVERS:
+        raise ValueError("Unknown solver '" + str(solver) + "'.")
+    strategies = tuple(name for name, _ in select(strategies))
+    loop = asyncio.get_running_loop()
+    cancel = threading.Event()
+    try:
+        result = await loop.run_in_executor(
+            None, _solve_task, puzzle, solver, strategies, timeout, cancel)
+    except asyncio.CancelledError:
+        cancel.set()
+        raise
+    return _result(*result)
+
+
+class SolverService:
+    """
+    SolverService object used to solve sudokus for asyncio code across a
+    pool of worker processes.
+
+    The queue and consumers are created on first use, inside the running
+    event loop, and stopped by close().
+
+    Attributes:
+        _workers (int): The number of worker processes
+        _queue_size (int):  The largest number of requests waiting at once
+        _solver (str):  The name of the search to use
+        _strategies (Tuple[str]):   The names of the logical strategies to use
+        _executor (ProcessPoolExecutor):    The pool of worker processes
+        _flags (multiprocessing.RawArray):  The cancel flag of each consumer,
+                                            shared with the workers
+        _queue (asyncio.Queue): The requests waiting for a worker, as
+                                (puzzle, deadline, future) tuples
+        _consumers (List[asyncio.Task]):    The tasks passing requests from the
+                                            queue to the pool
+        _closed (bool): Whether close() has been called
+    """
+    _workers = 1
+    _queue_size = 1
+    _solver = "trail"
+    _strategies = ()
+    _executor = None
+    _flags = None
+    _queue = None
+    _consumers = []
+    _closed = False
+
+    def __init__(self, workers: int = None, queue_size: int = None,
+                 solver: str = "trail", strategies: () = ()):
+        """
+        Constructor for an instance of the SolverService object.
+        @param workers: The number of worker processes (defaults to the number
+                        of CPUs)
+        @type workers:  int
+        @param queue_size:  The largest number of requests waiting for a
+                            worker (defaults to 4 per worker)
+        @type queue_size:   int
+        @param solver:  The name of the search to use (see Sudoku.solve())
+        @type solver:   str
+        @param strategies:  The names of the logical strategies to use (see
+                            Sudoku.solve())
+        @type strategies:   Iterable[str]
+        @raise ValueError:  An argument is out of range or unknown
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if queue_size is None:
+            queue_size = workers * 4
+        if workers < 1 or queue_size < 1:
+            raise ValueError("workers and queue_size must be at least 1.")
+        if solver not in SOLVERS:
+            raise ValueError("Unknown solver '" + str(solver) + "'.")
+        self._workers = workers
+        self._queue_size = queue_size
+        self._solver = solver
+        self._strategies = tuple(name for name, _ in select(strategies))
+        self._executor = None
+        self._flags = None
+        self._queue = None
+        self._consumers = []
+        self._closed = False
+
+    def _start(self):
+        """
+        Operation to create the pool, queue and consumers on first use.
+        """
+        if self._queue is not None:
+            return
+        self._flags = multiprocessing.RawArray("b", self._workers)
+        self._executor = ProcessPoolExecutor(max_workers=self._workers,
+                                             initializer=_init_worker,
+                                             initargs=(self._flags,))
+        self._queue = asyncio.Queue(self._queue_size)
+        self._consumers = [asyncio.ensure_future(self._consume(slot))
+                           for slot in range(0, self._workers, 1)]
+
+    async def _consume(self, slot: int):
+        """
+        Operation run by each consumer, passing queued requests to the pool
+        one at a time until the service is closed.
+        @param slot:    The index of the cancel flag of this consumer
+        @type slot:     int
+        """
+        loop = asyncio.get_running_loop()
+        flags = self._flags
+        running = None
+
+        def stop(done: asyncio.Future):
+            # Callbacks run later, so one left from an earlier request must
+            # not stop the search of the request running now
+            if done is running and done.cancelled():
+                flags[slot] = 1
+
+        while True:
+            puzzle, deadline, future = await self._queue.get()
+            try:
+                if future.cancelled():
+                    continue
+                timeout = None
+                if deadline is not None:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        future.set_result((TIMEOUT, None))
+                        continue
+                flags[slot] = 0
+                running = future
+                future.add_done_callback(stop)
+                try:
+                    result = await loop.run_in_executor(
+                        self._executor, _solve_shared, puzzle, self._solver,
+                        self._strategies, timeout, slot)
+                except asyncio.CancelledError:
+                    # The service is closing, so the request is abandoned
+                    flags[slot] = 1
+                    future.cancel()
+                    raise
+                except Exception as error:
+                    if not future.cancelled():
+                        future.set_exception(error)
+                    continue
+                finally:
+                    running = None
+                if not future.cancelled():
+                    future.set_result(result)
+            finally:
+                self._queue.task_done()
+
+    async def submit(self, puzzle: str,
+                     timeout: float = None) -> asyncio.Future:
+        """
+        Operation to queue a puzzle, waiting while the queue is full.
+        @param puzzle:  The sudoku to solve (see sudoku.formats)
+        @type puzzle:   str
+        @param timeout: The number of seconds from now to give up at, time
+                        spent queued included (None for no limit)
+        @type timeout:  float
+        @return:    The future that will hold the status of the request (see
+                    STATUSES) and the solution (None unless solved), already
+                    cancelled if the service was closed while waiting
+        @rtype:     asyncio.Future
+        @raise RuntimeError:    The service has been closed
+        """
+        if self._closed:
+            raise RuntimeError("The service has been closed.")
+        self._start()
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        future = loop.create_future()
+        await self._queue.put((puzzle, deadline, future))
+        if self._closed:
+            # close() made room while draining the queue, so the request is
+            # abandoned with the rest
+            future.cancel()
+        return future
+
+    async def solve(self, puzzle: str, timeout: float = None) -> str:
+        """
+        Operation to solve a puzzle in the pool.
+        @param puzzle:  The sudoku to solve (see sudoku.formats)
+        @type puzzle:   str
+        @param timeout: The number of seconds from now to give up at, time
+                        spent queued included (None for no limit)
+        @type timeout:  float
+        @return:    The solution (None if the puzzle is malformed or has no
+                    solution)
+        @rtype:     str
+        @raise asyncio.TimeoutError:    The request ran out of time
+        @raise asyncio.CancelledError:  The service was closed first
+        @raise RuntimeError:    The service has been closed
+        """
+        return _result(*await (await self.submit(puzzle, timeout)))
+
+    async def close(self):
+        """
+        Operation to stop the consumers and shut the pool down, abandoning
+        any requests still queued or waiting for room in the queue.
+
+        Running searches are told to stop, and the pool is waited for in
+        the loop's default executor so the loop carries on meanwhile. The
+        service cannot be used again once closed.
+        """
+        self._closed = True
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+        if self._executor is not None:
+            executor = self._executor
+            self._executor = None
+            await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(executor.shutdown, wait=True,
+                                        cancel_futures=True))
+            self._flags = None
+        queue = self._queue
+        if queue is not None:
+            while not queue.empty():
+                while not queue.empty():
+                    _, _, future = queue.get_nowait()
+                    future.cancel()
+                # Each request taken out lets a caller waiting for room put
+                # its own, so carry on until none are left
+                await asyncio.sleep(0)
+            self._queue = None
+
+    async def __aenter__(self):
+        """
+        Operation for using this service in an async with statement.
+        @return:    This service
+        @rtype:     SolverService
+        """
+        return self
+
+    async def __aexit__(self, *_):
+        """
+        Operation to close this service at the end of an async with statement.
+        """
+        await self.close()
+
+
+async def _respond(request: dict, future: asyncio.Future, output):
+    """
+    Function to write the response to one request once it completes.
+    @param request: The request read
+    @type request:  dict
+    @param future:  The future returned by SolverService.submit()
+    @type future:   asyncio.Future
+    @param output:  The stream to write the response to
+    @type output:   TextIO
+    """
+    status, solution = await future
+    output.write(json.dumps({"id": request.get("id"), "status": status,
+                             "solution": solution}) + "\n")
+    output.flush()
+
+
+async def serve(service: SolverService, source, output,
+                timeout: float = None):
+    """
+    Function to answer JSON-lines requests until the input ends.
+
+    Each line is an object holding the "puzzle" to solve and optionally an
+    "id" (echoed back) and a "timeout" in seconds. A line that cannot be read
+    is answered with the status "invalid". Reading stops while the queue of
+    the service is full.
+    @param service: The service to solve the requests with
+    @type service:  SolverService
+    @param source:  The stream to read requests from
+    @type source:   TextIO
+    @param output:  The stream to write responses to
+    @type output:   TextIO
+    @param timeout: The timeout of requests that do not give one (None for no
+                    limit)
+    @type timeout:  float
+    """
+    loop = asyncio.get_running_loop()
+    pending = set()
+    while True:
+        line = await loop.run_in_executor(None, source.readline)
+        if not line:
+            break
+        line = line.strip()
+        if not line:
+            continue
+        request = None
+        try:
+            request = json.loads(line)
+            puzzle = str(request["puzzle"])
+            limit = request.get("timeout", timeout)
+            if limit is not None:
+                limit = float(limit)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            if not isinstance(request, dict):
+                request = {}
+            output.write(json.dumps({"id": request.get("id"),
+                                     "status": INVALID,
+                                     "solution": None}) + "\n")
+            output.flush()
+            continue
+        future = await service.submit(puzzle, limit)
+        task = asyncio.ensure_future(_respond(request, future, output))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    if pending:
+        await asyncio.gather(*pending)
+
+
+def main():
+    """
+    Function to run if this module is executed - answers JSON-lines requests
+    from stdin on stdout with the arguments given to the program.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m sudoku.service",
+        description="Solve sudokus sent as JSON lines on stdin, writing a "
+                    "JSON line per result to stdout as each completes.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: CPUs)")
+    parser.add_argument("--queue-size", type=int, default=None,
+                        help="requests waiting for a worker before reading "
+                             "stops (default 4 per worker)")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="seconds allowed per request that does not set "
+                             "its own (default no limit)")
+    parser.add_argument("--solver", choices=SOLVERS, default="trail",
+                        help="search used when guessing (default trail)")
+    parser.add_argument("--strategies", nargs="*", choices=NAMES, default=(),
+                        help="logical strategies to run before guessing")
+    args = parser.parse_args(sys.argv[1:])
+
+    async def run():
+        async with SolverService(args.workers, args.queue_size, args.solver,
+                                 args.strategies) as service:
+            await serve(service, sys.stdin, sys.stdout, args.timeout)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
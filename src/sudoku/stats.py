@@ -0,0 +1,139 @@
+"""
+Counters and hooks describing the work done by a solve.
+"""
+
+
+class SolveStats:
+    """
+    SolveStats object used to record what a search did while solving a sudoku.
+
+    An instance is passed to Sudoku.solve() and filled in as the search runs,
+    and can be read back afterwards through Sudoku.get_stats(). When no
+    instance is passed nothing is recorded, so the searches pay no cost.
+
+    Hooks can be set to be told of every guess and backtrack as it happens.
+    Each is called with the x and y coordinates of the box, the value tried
+    and the number of guesses on the current path (including this one).
+
+    Attributes:
+        guesses (int):  The number of values tried in boxes (or candidates
+                        tried by Dancing Links) while searching
+        backtracks (int):   The number of guesses that failed and were undone
+        clones (int):   The number of Sudoku copies made by the "clone"
+                        search
+        propagations (int): The number of times the consequences of solved
+                            boxes were propagated (once at the start and once
+                            per guess)
+        eliminations (int): The number of times a box's options were reduced
+                            by propagation or a guess
+        strategies (dict[str, int]):    The number of times each logical
+                                        strategy made progress (see
+                                        sudoku.strategies)
+        depth (int):    The number of guesses on the current search path
+        max_depth (int):    The largest number of guesses on one search path
+        seconds (float):    The time taken by the solve
+        on_guess (Callable[[int, int, int, int], None]):    Function called
+                            after a guess is counted (None for no hook)
+        on_backtrack (Callable[[int, int, int, int], None]):    Function
+                            called before a failed guess is undone (None for
+                            no hook)
+        width (int):    The width of the board being solved, used to find the
+                        coordinates of a box from its index (set by
+                        Sudoku.solve())
+    """
+    guesses = 0
+    backtracks = 0
+    clones = 0
+    propagations = 0
+    eliminations = 0
+    strategies = {}
+    depth = 0
+    max_depth = 0
+    seconds = 0.0
+    on_guess = None
+    on_backtrack = None
+    width = 9
+
+    def __init__(self, on_guess=None, on_backtrack=None):
+        """
+        Constructor for an instance of the SolveStats object with every
+        counter at zero.
+        @param on_guess:    Function called with (x, y, value, depth) for
+                            every guess (None for no hook)
+        @type on_guess:     Callable[[int, int, int, int], None]
+        @param on_backtrack:    Function called with (x, y, value, depth) for
+                                every failed guess (None for no hook)
+        @type on_backtrack:     Callable[[int, int, int, int], None]
+        """
+        self.guesses = 0
+        self.backtracks = 0
+        self.clones = 0
+        self.propagations = 0
+        self.eliminations = 0
+        self.strategies = {}
+        self.depth = 0
+        self.max_depth = 0
+        self.seconds = 0.0
+        self.on_guess = on_guess
+        self.on_backtrack = on_backtrack
+        self.width = 9
+
+    def guess(self, index: int, value: int):
+        """
+        Operation to record a value being tried in a box.
+        @param index:   The row-major index of the box
+        @type index:    int
+        @param value:   The value tried
+        @type value:    int
+        """
+        self.guesses += 1
+        self.depth += 1
+        if self.depth > self.max_depth:
+            self.max_depth = self.depth
+        if self.on_guess is not None:
+            self.on_guess(index % self.width, index // self.width, value,
+                          self.depth)
+
+    def backtrack(self, index: int, value: int):
+        """
+        Operation to record a guess failing and being undone.
+        @param index:   The row-major index of the box
+        @type index:    int
+        @param value:   The value that was tried
+        @type value:    int
+        """
+        self.backtracks += 1
+        if self.on_backtrack is not None:
+            self.on_backtrack(index % self.width, index // self.width, value,
+                              self.depth)
+        self.depth -= 1
+
+    def propagated(self, eliminations: int):
+        """
+        Operation to record one propagation.
+        @param eliminations:    The number of times a box's options were
+                                reduced by it
+        @type eliminations:     int
+        """
+        self.propagations += 1
+        self.eliminations += eliminations
+
+    def used(self, strategy: str):
+        """
+        Operation to record a logical strategy making progress.
+        @param strategy:    The name of the strategy
+        @type strategy:     str
+        """
+        self.strategies[strategy] = self.strategies.get(strategy, 0) + 1
+
+    def to_dict(self) -> dict:
+        """
+        Operation for converting these statistics to a plain dictionary.
+        @return:    The value of every counter by name
+        @rtype:     dict
+        """
+        return {"guesses": self.guesses, "backtracks": self.backtracks,
+                "clones": self.clones, "propagations": self.propagations,
+                "eliminations": self.eliminations,
+                "strategies": dict(self.strategies),
+                "max_depth": self.max_depth, "seconds": self.seconds}
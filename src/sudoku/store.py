@@ -0,0 +1,326 @@
+"""
+Persistent store of solved puzzles, looked up without loading the file.
+
+The store is a file of fixed width records, each being the 81 bytes of a
+puzzle (using '.' for empty cells) followed by the 81 digits of its
+solution, sorted by puzzle. The file is memory mapped and searched by
+bisection, so opening it costs nothing however many records it holds and a
+lookup only touches O(log n) pages. Records are added in bulk by merging
+them with the existing file into a new one, which then replaces it; new
+records are sorted in runs of RUN_SIZE spilled to temporary files, so adding
+any number of them uses bounded memory. Only 9x9 puzzles are stored, so
+every record has the same width.
+"""
+import heapq
+import mmap
+import os
+
+PUZZLE_SIZE = 81
+""" int:    The number of bytes in the puzzle of a record.
+"""
+RECORD_SIZE = PUZZLE_SIZE * 2
+""" int:    The number of bytes in a record (the puzzle then its solution).
+"""
+RUN_SIZE = 100000
+""" int:    The number of new records sorted in memory at once by add_many(),
+            bounding the memory it uses (about 200 bytes per record).
+"""
+_EMPTY = frozenset(b".0")
+""" FrozenSet[int]: The bytes allowed for an empty cell of a puzzle.
+"""
+_DIGITS = frozenset(b"123456789")
+""" FrozenSet[int]: The bytes allowed for a solved cell.
+"""
+
+
+def _key(puzzle: str) -> bytes:
+    """
+    Function to find the bytes a puzzle is stored under.
+    @param puzzle:  The puzzle as 81 characters ('0' or '.' for empty cells)
+    @type puzzle:   str
+    @return:    The puzzle using '.' for empty cells (None if it is
+                malformed)
+    @rtype:     bytes
+    """
+    key = puzzle.strip().encode("ascii", "replace")
+    if len(key) != PUZZLE_SIZE or not all(
+            byte in _DIGITS or byte in _EMPTY for byte in key):
+        return None
+    return key.replace(b"0", b".")
+
+
+def _read_records(file):
+    """
+    Generator reading the records of a file one at a time.
+    @param file:    The file to read, open in binary mode
+    @type file:     BinaryIO
+    @return:    The bytes of each record
+    @rtype:     Iterator[bytes]
+    """
+    record = file.read(RECORD_SIZE)
+    while record:
+        yield record
+        record = file.read(RECORD_SIZE)
+
+
+def _tagged(records, age: int):
+    """
+    Generator pairing each record with the age of its source.
+    @param records: The records to tag
+    @type records:  Iterable[bytes]
+    @param age:     The age of the source (higher being newer)
+    @type age:      int
+    @return:    (record, age) pairs
+    @rtype:     Iterator[Tuple[bytes, int]]
+    """
+    for record in records:
+        yield record, age
+
+
+class SolutionStore:
+    """
+    SolutionStore object used to look up the solutions of puzzles solved on
+    an earlier run.
+
+    Attributes:
+        _path (str):    The path of the store file
+        _file (BinaryIO):   The open store file (None if it is empty)
+        _map (mmap.mmap):   The memory map of the store file (None if it is
+                            empty)
+        _count (int):   The number of records in the store
+    """
+    _path = None
+    _file = None
+    _map = None
+    _count = 0
+
+    def __init__(self, path: str):
+        """
+        Constructor for an instance of the SolutionStore object, opening the
+        store file (a missing file is an empty store, created by add_many()).
+        @param path:    The path of the store file
+        @type path:     str
+        @raise ValueError:  The file is not a whole number of records
+        """
+        self._path = path
+        self._file = None
+        self._map = None
+        self._count = 0
+        self._open()
+
+    def _open(self):
+        """
+        Operation to memory map the store file.
+        @raise ValueError:  The file is not a whole number of records
+        """
+        if not os.path.exists(self._path):
+            return
+        size = os.path.getsize(self._path)
+        if size % RECORD_SIZE:
+            raise ValueError("'" + self._path + "' is not a solution store.")
+        if size == 0:
+            return
+        self._file = open(self._path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._count = size // RECORD_SIZE
+
+    def close(self):
+        """
+        Operation to unmap and close the store file.
+        """
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._count = 0
+
+    def __enter__(self):
+        """
+        Operation for using this store in a with statement.
+        @return:    This store
+        @rtype:     SolutionStore
+        """
+        return self
+
+    def __exit__(self, *_):
+        """
+        Operation to close this store at the end of a with statement.
+        """
+        self.close()
+
+    def __len__(self) -> int:
+        """
+        Operation for finding the number of records in the store.
+        @return:    The number of records
+        @rtype:     int
+        """
+        return self._count
+
+    def get_path(self) -> str:
+        """
+        Getter for the path of the store file.
+        @return:    The path this store was opened from
+        @rtype:     str
+        """
+        return self._path
+
+    def _puzzle_at(self, number: int) -> bytes:
+        """
+        Operation for reading the puzzle of a record.
+        @param number:  The position of the record in the file
+        @type number:   int
+        @return:    The 81 bytes of the puzzle
+        @rtype:     bytes
+        """
+        start = number * RECORD_SIZE
+        return self._map[start:start + PUZZLE_SIZE]
+
+    def _find(self, key: bytes) -> int:
+        """
+        Operation to bisect the records for a puzzle.
+        @param key:     The puzzle to look for (see _key())
+        @type key:      bytes
+        @return:    The position of the first record not before the puzzle
+        @rtype:     int
+        """
+        low = 0
+        high = self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._puzzle_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def get(self, puzzle: str) -> str:
+        """
+        Operation for looking up the solution of a puzzle.
+        @param puzzle:  The puzzle as 81 characters ('0' or '.' for empty
+                        cells)
+        @type puzzle:   str
+        @return:    The 81 digits of the solution (None if the puzzle is not
+                    stored or is malformed)
+        @rtype:     str
+        """
+        key = _key(puzzle)
+        if key is None or self._map is None:
+            return None
+        number = self._find(key)
+        if number == self._count or self._puzzle_at(number) != key:
+            return None
+        start = number * RECORD_SIZE + PUZZLE_SIZE
+        return self._map[start:start + PUZZLE_SIZE].decode("ascii")
+
+    def __contains__(self, puzzle: str) -> bool:
+        """
+        Operation for checking whether a puzzle is stored.
+        @param puzzle:  The puzzle as 81 characters
+        @type puzzle:   str
+        @return:    True = its solution is stored, False = it is not
+        @rtype:     bool
+        """
+        return self.get(puzzle) is not None
+
+    def _records(self):
+        """
+        Generator reading every record in order.
+        @return:    The bytes of each record
+        @rtype:     Iterator[bytes]
+        """
+        for number in range(0, self._count, 1):
+            start = number * RECORD_SIZE
+            yield self._map[start:start + RECORD_SIZE]
+
+    def _write_run(self, records: dict, number: int) -> str:
+        """
+        Operation to write a run of new records to a temporary file, sorted.
+        @param records: The solution by puzzle of each new record
+        @type records:  dict[bytes, bytes]
+        @param number:  The number of the run, naming its file
+        @type number:   int
+        @return:    The path of the run file
+        @rtype:     str
+        """
+        path = self._path + ".run" + str(number)
+        with open(path, "wb") as file:
+            for key in sorted(records):
+                file.write(key + records[key])
+        return path
+
+    def add_many(self, solutions) -> int:
+        """
+        Operation to add many solved puzzles to the store at once.
+
+        The new records are sorted in runs of at most RUN_SIZE, each written
+        to a temporary file, and the runs are merged with the existing file
+        into a temporary file beside it, which then atomically replaces the
+        store, so readers never see a partly written file and memory does
+        not grow with the number of records. A puzzle already stored has its
+        solution replaced (by the last one given if it is given twice).
+        @param solutions:   (puzzle, solution) pairs, the puzzle as 81
+                            characters and the solution as 81 digits
+        @type solutions:    Iterable[Tuple[str, str]]
+        @return:    The number of records in the store afterwards
+        @rtype:     int
+        @raise ValueError:  A puzzle or solution is malformed
+        """
+        runs = []
+        try:
+            new = {}
+            for puzzle, solution in solutions:
+                key = _key(puzzle)
+                value = solution.strip().encode("ascii", "replace")
+                if key is None or len(value) != PUZZLE_SIZE or not all(
+                        byte in _DIGITS for byte in value):
+                    raise ValueError("Malformed record '" + str(puzzle)
+                                     + "'.")
+                new[key] = value
+                if len(new) >= RUN_SIZE:
+                    runs.append(self._write_run(new, len(runs)))
+                    new = {}
+            if new:
+                runs.append(self._write_run(new, len(runs)))
+            if not runs:
+                return self._count
+            self._merge(runs)
+        finally:
+            for path in runs:
+                os.remove(path)
+        return self._count
+
+    def _merge(self, runs: []):
+        """
+        Operation to merge sorted run files with the store into a new store
+        file that replaces it.
+
+        Where a puzzle is in more than one source, the record from the
+        latest run wins over earlier runs and the existing file.
+        @param runs:    The paths of the run files, oldest first
+        @type runs:     List[str]
+        """
+        files = [open(path, "rb") for path in runs]
+        try:
+            # Tag each record with the age of its source to settle duplicates
+            sources = [_tagged(self._records(), 0)]
+            for age, file in enumerate(files, 1):
+                sources.append(_tagged(_read_records(file), age))
+            temporary = self._path + ".tmp"
+            with open(temporary, "wb") as output:
+                last = None
+                for record, _ in heapq.merge(*sources, key=lambda tagged: (
+                        tagged[0][:PUZZLE_SIZE], tagged[1])):
+                    if last is not None \
+                            and last[:PUZZLE_SIZE] != record[:PUZZLE_SIZE]:
+                        output.write(last)
+                    last = record
+                if last is not None:
+                    output.write(last)
+        finally:
+            for file in files:
+                file.close()
+        self.close()
+        os.replace(temporary, self._path)
+        self._open()
@@ -0,0 +1,352 @@
+"""
+Logical solving strategies run before the search guesses a value.
+
+Propagation (see sudoku.propagation) already removes the values of solved
+cells from their peers and solves hidden singles. The strategies here find
+further eliminations that need more work to spot, so fewer guesses are made
+on hard puzzles. Each can be switched on by name and they always run
+cheapest first, going back to the cheapest after any of them makes progress.
+
+Every strategy takes the flat list of option masks (of any board size, see
+sudoku.layout) and returns a dict mapping the index of every cell it changed to
+the options removed, or None if it found a contradiction. It never changes a
+cell itself - apply() makes the eliminations so they are recorded on the undo
+trail.
+"""
+from itertools import combinations
+
+from sudoku.bitmask import popcount
+from sudoku.layout import layout_of
+from sudoku.propagation import propagate
+from sudoku.stats import SolveStats
+
+
+def _cells_with(cells: [], unit: (), bit: int) -> []:
+    """
+    Function to list the unsolved cells of a unit that could take a value.
+    @param cells:   The flat list of option masks
+    @type cells:    array[int]
+    @param unit:    The cell indexes of the unit
+    @type unit:     Tuple[int]
+    @param bit:     The single option mask of the value
+    @type bit:      int
+    @return:    The indexes of the cells, empty if the value is solved in the
+                unit
+    @rtype:     List[int]
+    """
+    found = []
+    for index in unit:
+        mask = cells[index]
+        if mask & bit:
+            if mask == bit:
+                return []
+            found.append(index)
+    return found
+
+
+def _remove(removals: dict, cells: [], indexes, bits: int):
+    """
+    Function to note the options to remove from some cells.
+    @param removals:    The options to remove so far, by cell index
+    @type removals:     dict[int, int]
+    @param cells:   The flat list of option masks
+    @type cells:    array[int]
+    @param indexes: The cells to remove the options from
+    @type indexes:  Iterable[int]
+    @param bits:    The mask of the options to remove
+    @type bits:     int
+    """
+    for index in indexes:
+        if cells[index] & bits:
+            removals[index] = removals.get(index, 0) | (cells[index] & bits)
+
+
+def naked_subsets(cells: [], size: int) -> dict:
+    """
+    Function to find naked pairs or triples.
+
+    If size unsolved cells of a unit only hold size values between them,
+    those values can be removed from every other cell of the unit.
+    @param cells:   The flat list of option masks
+    @type cells:    array[int]
+    @param size:    The number of cells in the subset (2 or 3)
+    @type size:     int
+    @return:    The options to remove by cell index (None on a contradiction)
+    @rtype:     dict[int, int]
+    """
+    removals = {}
+    for unit in layout_of(cells).units:
+        small = [index for index in unit
+                 if 1 < popcount(cells[index]) <= size]
+        for subset in combinations(small, size):
+            union = 0
+            for index in subset:
+                union |= cells[index]
+            count = popcount(union)
+            if count < size:
+                return None
+            if count == size:
+                _remove(removals, cells,
+                        (index for index in unit if index not in subset),
+                        union)
+    return removals
+
+
+def hidden_subsets(cells: [], size: int) -> dict:
+    """
+    Function to find hidden pairs or triples.
+
+    If size values of a unit can only go in the same size cells, those cells
+    cannot take any other value.
+    @param cells:   The flat list of option masks
+    @type cells:    array[int]
+    @param size:    The number of values in the subset (2 or 3)
+    @type size:     int
+    @return:    The options to remove by cell index (None on a contradiction)
+    @rtype:     dict[int, int]
+    """
+    layout = layout_of(cells)
+    removals = {}
+    for unit in layout.units:
+        places = {}
+        for value in range(0, layout.size, 1):
+            found = _cells_with(cells, unit, 1 << value)
+            if 1 < len(found) <= size:
+                places[1 << value] = found
+        for subset in combinations(places, size):
+            union = set()
+            for bit in subset:
+                union.update(places[bit])
+            if len(union) < size:
+                return None
+            if len(union) == size:
+                keep = 0
+                for bit in subset:
+                    keep |= bit
+                for index in union:
+                    if cells[index] & ~keep:
+                        removals[index] = removals.get(index, 0) | (
+                            cells[index] & ~keep)
+    return removals
+
+
+def naked_pairs(cells: []) -> dict:
+    """
+    Strategy removing the values of naked pairs (see naked_subsets()).
+    @param cells:   The flat list of option masks
+    @type cells:    array[int]
+    @return:    The options to remove by cell index (None on a contradiction)
+    @rtype:     dict[int, int]
+    """
+    return naked_subsets(cells, 2)
+
+
+def naked_triples(cells: []) -> dict:
+    """
+    Strategy removing the values of naked triples (see naked_subsets()).
+    @param cells:   The flat list of option masks
+    @type cells:    array[int]
+    @return:    The options to remove by cell index (None on a contradiction)
+    @rtype:     dict[int, int]
+    """
+    return naked_subsets(cells, 3)
+
+
+def hidden_pairs(cells: []) -> dict:
+    """
+    Strategy reducing the cells of hidden pairs (see hidden_subsets()).
+    @param cells:   The flat list of option masks
+    @type cells:    array[int]
+    @return:    The options to remove by cell index (None on a contradiction)
+    @rtype:     dict[int, int]
+    """
+    return hidden_subsets(cells, 2)
+
+
+def hidden_triples(cells: []) -> dict:
+    """
+    Strategy reducing the cells of hidden triples (see hidden_subsets()).
+    @param cells:   The flat list of option masks
+    @type cells:    array[int]
+    @return:    The options to remove by cell index (None on a contradiction)
+    @rtype:     dict[int, int]
+    """
+    return hidden_subsets(cells, 3)
+
+
+def pointing(cells: []) -> dict:
+    """
+    Strategy for pointing pairs and triples.
+
+    If a value can only go in one row (or column) of a square, it must be
+    placed there, so it is removed from the rest of that row (or column).
+    @param cells:   The flat list of option masks
+    @type cells:    array[int]
+    @return:    The options to remove by cell index (None on a contradiction)
+    @rtype:     dict[int, int]
+    """
+    layout = layout_of(cells)
+    size = layout.size
+    removals = {}
+    for square in layout.units[size * 2:]:
+        for value in range(0, size, 1):
+            bit = 1 << value
+            found = _cells_with(cells, square, bit)
+            if len(found) < 2:
+                continue
+            rows = {index // size for index in found}
+            columns = {index % size for index in found}
+            if len(rows) == 1:
+                _remove(removals, cells,
+                        (index for index in layout.units[rows.pop()]
+                         if index not in square), bit)
+            elif len(columns) == 1:
+                _remove(removals, cells,
+                        (index for index in layout.units[size + columns.pop()]
+                         if index not in square), bit)
+    return removals
+
+
+def box_line(cells: []) -> dict:
+    """
+    Strategy for box/line reduction.
+
+    If a value can only go in one square within a row (or column), it must
+    be placed there, so it is removed from the rest of that square.
+    @param cells:   The flat list of option masks
+    @type cells:    array[int]
+    @return:    The options to remove by cell index (None on a contradiction)
+    @rtype:     dict[int, int]
+    """
+    layout = layout_of(cells)
+    removals = {}
+    for line in layout.units[:layout.size * 2]:
+        for value in range(0, layout.size, 1):
+            bit = 1 << value
+            found = _cells_with(cells, line, bit)
+            if len(found) < 2:
+                continue
+            squares = {layout.cell_units[index][2] for index in found}
+            if len(squares) == 1:
+                _remove(removals, cells, (index for index in
+                                          layout.units[squares.pop()]
+                                          if index not in line), bit)
+    return removals
+
+
+def x_wing(cells: []) -> dict:
+    """
+    Strategy for X-wings.
+
+    If a value can only go in the same two columns of two rows, it must take
+    one corner of each diagonal, so it is removed from the rest of those
+    columns (and the same with rows and columns swapped).
+    @param cells:   The flat list of option masks
+    @type cells:    array[int]
+    @return:    The options to remove by cell index (None on a contradiction)
+    @rtype:     dict[int, int]
+    """
+    layout = layout_of(cells)
+    size = layout.size
+    rows = layout.units[:size]
+    columns = layout.units[size:size * 2]
+    removals = {}
+    for lines, crossing in ((rows, columns), (columns, rows)):
+        for value in range(0, size, 1):
+            bit = 1 << value
+            pairs = {}
+            for number, line in enumerate(lines):
+                found = _cells_with(cells, line, bit)
+                if len(found) == 2:
+                    positions = tuple(line.index(index) for index in found)
+                    pairs.setdefault(positions, []).append(number)
+            for positions, numbers in pairs.items():
+                if len(numbers) > 2:
+                    return None
+                if len(numbers) == 2:
+                    for position in positions:
+                        _remove(removals, cells,
+                                (index for index in crossing[position]
+                                 if index not in lines[numbers[0]]
+                                 and index not in lines[numbers[1]]), bit)
+    return removals
+
+
+STRATEGIES = (("naked_pairs", naked_pairs), ("pointing", pointing),
+              ("box_line", box_line), ("hidden_pairs", hidden_pairs),
+              ("naked_triples", naked_triples), ("x_wing", x_wing),
+              ("hidden_triples", hidden_triples))
+""" Tuple[Tuple[str, Callable]]:    Every strategy by name, cheapest first.
+"""
+NAMES = tuple(name for name, _ in STRATEGIES)
+""" Tuple[str]: The names of every strategy, cheapest first.
+"""
+
+
+def select(names) -> ():
+    """
+    Function to look up strategies by name, ordered cheapest first.
+    @param names:   The names of the strategies wanted (see NAMES)
+    @type names:    Iterable[str]
+    @return:    The (name, strategy) pairs, in the order of STRATEGIES
+    @rtype:     Tuple[Tuple[str, Callable]]
+    @raise ValueError:  A name is not a known strategy
+    """
+    names = set(names)
+    unknown = names - set(NAMES)
+    if unknown:
+        raise ValueError("Unknown strategy '" + sorted(unknown)[0] + "'.")
+    return tuple(strategy for strategy in STRATEGIES if strategy[0] in names)
+
+
+def apply(cells: [], strategies: (), trail: [] = None,
+          stats: SolveStats = None) -> bool:
+    """
+    Function to run strategies until none of them can make progress.
+
+    Each elimination is made on the cells (recorded on the trail) and
+    propagated before starting again from the cheapest strategy.
+    @param cells:   The flat list of option masks, changed in place
+    @type cells:    array[int]
+    @param strategies:  The (name, strategy) pairs to run (see select())
+    @type strategies:   Tuple[Tuple[str, Callable]]
+    @param trail:   The undo trail to record every changed mask on (nothing
+                    is recorded if None)
+    @type trail:    array[int]
+    @param stats:   The statistics to count strategy uses on (None to not
+                    count)
+    @type stats:    SolveStats
+    @return:    True = no contradiction found, False = the sudoku has no
+                solution
+    @rtype:     bool
+    """
+    cell_units = layout_of(cells).cell_units
+    progress = True
+    while progress:
+        progress = False
+        for name, strategy in strategies:
+            removals = strategy(cells)
+            if removals is None:
+                return False
+            if not removals:
+                continue
+            queue = []
+            dirty = set()
+            for index, bits in removals.items():
+                mask = cells[index] & ~bits
+                if mask == 0:
+                    return False
+                if trail is not None:
+                    trail.append(index)
+                    trail.append(cells[index])
+                cells[index] = mask
+                if mask & (mask - 1) == 0:
+                    queue.append(index)
+                dirty.update(cell_units[index])
+            if stats is not None:
+                stats.used(name)
+            if not propagate(cells, queue, dirty, trail):
+                return False
+            progress = True
+            break
+    return True
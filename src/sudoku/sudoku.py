@@ -1,4 +1,22 @@
+import time
+
+from sudoku import dlx
+from sudoku.backtrack import Search, SolveCancelled, SolveTimeout, count, \
+    fewest_options, search
+from sudoku.bitmask import lowest_bit, value_to_mask
 from sudoku.box import Box
+from sudoku.cache import NO_SOLUTION, SolutionCache
+from sudoku.formats import format_grid, format_rows, parse_bytes, \
+    parse_grid, parse_rows
+from sudoku.layout import get_layout_by_size, layout_of
+from sudoku.propagation import assign, is_consistent, propagate_all
+from sudoku.stats import SolveStats
+from sudoku.strategies import apply, select
+from sudoku.validation import find_conflicts
+
+SOLVERS = ("trail", "clone", "dlx")
+""" Tuple[str]: The names of the searches Sudoku.solve() can use.
+"""
 
 
 class Sudoku:
@@ -6,14 +24,22 @@ class Sudoku:
     Sudoku object used to simulate a sudoku puzzle with functions to solve.
 
     Attributes:
-        _array (array[Box]):    A 9x9 array with each cell holding a Box
-                                object that represents that cells value in the
-                                sudoku
+        _cells (array[int]):    A flat, row-major list of bitmasks (see
+                                sudoku.bitmask), the cell at coordinates
+                                (x, y) being held at index y * size + x where
+                                size is the width of the board (9 unless a
+                                larger board was loaded, see sudoku.layout)
         _solved (bool): Represents whether this sudoku object is solved (every
                         cell has been assigned one value)
+        _stats (SolveStats):    The statistics recorded by the last solve (None
+                                if none were asked for)
+        _paused (Search):   The search paused by solve_steps() (None if no
+                            search is paused)
     """
-    _array = []
+    _cells = []
     _solved = False
+    _stats = None
+    _paused = None
 
     def __init__(self, sudoku_array: []):
         """
@@ -22,34 +48,148 @@ class Sudoku:
         Defines the initial state of the puzzle with the array given.
         @param sudoku_array:    The array holding all cells values to be
                                 transferred to this Sudoku object.
-        @type sudoku_array: 2 options:
+        @type sudoku_array: 2 options (9x9 for the classic board, or 4x4,
+                            16x16 or 25x25):
                                 9x9 List[Box] -used for cloning a Sudoku object
                                 9x9 List[Combobox] -used for transferring a GUI
                                                     sudoku state with each cell
                                                     being a combobox
                                                     (tkinter.ttk.Combobox) to a
                                                     Sudoku object
+        @raise ValueError:  The array is not a supported size
         """
         self.set_solved(False)
-        self._array = [[], [], [], [], [], [], [], [], []]
+        layout = get_layout_by_size(len(sudoku_array))
+        size = layout.size
+        self._cells = [layout.all_options] * layout.cells
         if type(sudoku_array[0][0]) == Box:
-            for i in range(0, 9, 1):
-                for j in range(0, 9, 1):
-                    self._array[i].append(
-                        Box(sudoku_array[i][j].get_options().copy(), i, j))
+            for i in range(0, size, 1):
+                for j in range(0, size, 1):
+                    self._cells[j * size + i] = sudoku_array[i][j].get_mask()
         else:
-            for i in range(0, 9, 1):
-                for j in range(0, 9, 1):
+            for i in range(0, size, 1):
+                for j in range(0, size, 1):
                     value = sudoku_array[i][j].get()
-                    if value == "":
-                        self._array[i].append(
-                            Box([1, 2, 3, 4, 5, 6, 7, 8, 9], i, j))
-                    else:
-                        self._array[i].append(Box([int(value)], i, j))
+                    if value != "":
+                        self._cells[j * size + i] = value_to_mask(int(value))
+
+    @classmethod
+    def _from_cells(cls, cells: []) -> 'Sudoku':
+        """
+        Constructor for a Sudoku that takes ownership of a list of masks.
+        @param cells:   The flat, row-major list of option masks
+        @type cells:    array[int]
+        @return:    The new, unsolved Sudoku
+        @rtype:     Sudoku
+        """
+        sudoku = cls.__new__(cls)
+        sudoku._cells = cells
+        sudoku._solved = False
+        sudoku._paused = None
+        return sudoku
+
+    @classmethod
+    def from_string(cls, text: str) -> 'Sudoku':
+        """
+        Constructor for a Sudoku written as a string of one character per
+        cell (81 for a 9x9 board, see sudoku.formats).
+        @param text:    The symbols of the sudoku in row-major order, '0' or
+                        '.' for empty cells
+        @type text:     str
+        @return:    The new Sudoku
+        @rtype:     Sudoku
+        @raise ValueError:  The text is not a supported number of valid
+                            characters long
+        """
+        return cls._from_cells(parse_grid(text))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Sudoku':
+        """
+        Constructor for a Sudoku given as one byte per cell.
+        @param data:    ASCII symbols / '.' or raw values 0 to size in
+                        row-major order, 0 being an empty cell
+        @type data:     bytes
+        @return:    The new Sudoku
+        @rtype:     Sudoku
+        @raise ValueError:  The data is not a supported number of valid bytes
+                            long
+        """
+        return cls._from_cells(parse_bytes(data))
+
+    @classmethod
+    def from_rows(cls, rows: []) -> 'Sudoku':
+        """
+        Constructor for a Sudoku given as a list of rows.
+
+        Note rows are indexed [y][x], unlike the [x][y] arrays taken by the
+        default constructor.
+        @param rows:    size rows of size values, 0 or None being an empty
+                        cell
+        @type rows:     List[List[int]]
+        @return:    The new Sudoku
+        @rtype:     Sudoku
+        @raise ValueError:  The rows are not a supported square size or hold
+                            values outside 0 to size
+        """
+        return cls._from_cells(parse_rows(rows))
+
+    def to_string(self) -> str:
+        """
+        Operation for writing this sudoku as a string of one character per box.
+        @return:    The symbol of every solved box in row-major order, '.' for
+                    unsolved boxes
+        @rtype:     str
+        """
+        return format_grid(self._cells)
+
+    def to_bytes(self) -> bytes:
+        """
+        Operation for writing this sudoku as one ASCII byte per box.
+        @return:    The symbol of every solved box in row-major order, '.' for
+                    unsolved boxes
+        @rtype:     bytes
+        """
+        return format_grid(self._cells).encode("ascii")
+
+    def to_rows(self) -> []:
+        """
+        Operation for writing this sudoku as a list of rows.
+        @return:    size rows of size values indexed [y][x], 0 for unsolved
+                    boxes
+        @rtype:     List[List[int]]
+        """
+        return format_rows(self._cells)
+
+    def get_size(self) -> int:
+        """
+        Getter for the width of this sudoku board.
+        @return:    The number of boxes in a row (and of values a box can take)
+        @rtype:     int
+        """
+        return layout_of(self._cells).size
+
+    def get_block(self) -> int:
+        """
+        Getter for the width of the squares of this sudoku board.
+        @return:    The number of boxes in a row of a square (3 for 9x9)
+        @rtype:     int
+        """
+        return layout_of(self._cells).block
+
+    def get_stats(self) -> SolveStats:
+        """
+        Getter for the statistics recorded by the last call to solve().
+        @return:    The statistics passed to solve() (None if none were)
+        @rtype:     SolveStats
+        """
+        return self._stats
 
     def get_box(self, x: int, y: int) -> Box:
         """
         Getter for the Box object at the coordinates given.
+
+        The Box returned is a view, changes made to it change this sudoku.
         @param x:   The x coordinate of the Box wanted
         @type x:    int
         @param y:   The y coordinate of the Box wanted
@@ -57,14 +197,14 @@ class Sudoku:
         @return:    The Box in the cell with the coordinates given
         @rtype:     Box
         """
-        return self._array[x][y]
+        return Box.view(self._cells, x, y)
 
     def update_box(self, x: int, y: int) -> bool:
         """
         Operation for updating a box's list of possible values.
 
         Find the box with the coordinates given and removes all values of
-        solved boxes in the same row, column and 3x3 square as this box.
+        solved boxes in the same row, column and square as this box.
         @param x:   The x coordinate of the box to be updated
         @type x:    int
         @param y:   The y coordinate of the box to be updated
@@ -73,109 +213,330 @@ class Sudoku:
                     values has been reduces)
         @rtype:     bool
         """
-        box = self._array[x][y]
-        changed = False
-        if not box.is_solved():
-            # remove from options any solved boxes in the column
-            col = self._array[x]
-            i = 0
-            while i < 9:
-                if col[i].is_solved() and i != box.get_y():
-                    if box.remove_option(col[i].get_value()):
-                        changed = True
-                i += 1
-
-            if not box.is_solved():
-                # remove from options any solved boxes in the row
-                row_num = box.get_y()
-                i = 0
-                while i < 9:
-                    if self.get_box(i,
-                                    row_num).is_solved() and i != box.get_x():
-                        if box.remove_option(
-                                self.get_box(i, row_num).get_value()):
-                            changed = True
-                    i += 1
-
-                if not box.is_solved():
-                    # remove from options any solved boxes in the 3x3 square
-                    i = box.get_3x3_x()
-                    while i < box.get_3x3_x() + 3:
-                        j = box.get_3x3_y()
-                        while j < box.get_3x3_y() + 3:
-                            if self.get_box(i, j).is_solved() and (
-                                    i != box.get_x() and j != box.get_y()):
-                                if box.remove_option(
-                                        self.get_box(i, j).get_value()):
-                                    changed = True
-                            j += 1
-                        i += 1
-        return changed
-
-    def solve(self) -> bool:
+        cells = self._cells
+        layout = layout_of(cells)
+        index = y * layout.size + x
+        mask = cells[index]
+        if mask & (mask - 1) == 0:
+            # Box is already solved (or empty)
+            return False
+        # Collect the values of every solved box in the column, row and
+        # square
+        solved = 0
+        for peer in layout.peers[index]:
+            other = cells[peer]
+            if other & (other - 1) == 0:
+                solved |= other
+        if mask & solved:
+            cells[index] = mask & ~solved
+            return True
+        return False
+
+    def solve(self, solver: str = "trail", stats: SolveStats = None,
+              strategies: () = (), cache: SolutionCache = None,
+              timeout: float = None, cancel=None) -> bool:
         """
         Operation to solve the sudoku puzzle represent by this object's state.
 
-        Iterates through every box and updates their list's of possible values.
+        The value of every solved box is removed from its peers (see
+        sudoku.propagation), solving further boxes as they are left with one
+        option or become the only place for a value in a row, column or
+        square. Any further logical strategies named (see sudoku.strategies)
+        are then run, cheapest first, before each guess.
+
+        If a cache is given, a 9x9 sudoku holding only givens and empty boxes
+        (at least one of them empty, as a full grid is checked faster than it
+        is looked up) is first looked up in it (see sudoku.cache), and its
+        result is stored there after solving. If a timeout is given, every
+        search checks the time before each guess and gives up by raising
+        SolveTimeout once it has passed. If a cancel flag is given, it is
+        checked at the same point and the search gives up by raising
+        SolveCancelled once the flag is set (from another thread or process).
         For easy sudoku puzzles:
             This will solve and the function is executed.
         For harder sudoku puzzles:
-            The iteration will become stuck because the sudoku puzzle will not
-            be changing. This is detected and a box is selected that has the
-            lowest number of possible values (for highest probability of
-            success). These values are cycled through by creating a clone
-            Sudoku object with the value selected as the box's value, and then
-            attempting to solve. The clone that returns solved and with no
-            errors is the solved sudoku puzzle, so the function is executed.
+            The propagation will become stuck. A box is then selected that has
+            the lowest number of possible values (for highest probability of
+            success) and these values are cycled through, propagating and
+            searching again after each one. How the sudoku is restored after a
+            failed guess depends on the solver chosen:
+                "trail" -   This sudoku is changed in place and every change is
+                            recorded on an undo trail that is rolled back (see
+                            sudoku.backtrack)
+                "clone" -   A clone Sudoku object is created for every guess,
+                            the clone that returns solved is kept
+                "dlx" -     Instead of guessing box values, the sudoku is
+                            solved as an exact cover problem with Dancing Links
+                            (see sudoku.dlx), which has a more predictable
+                            worst case on puzzles that defeat the other two
 
         IMPORTANT:  To prevent errors, a call to the function is_valid() should
                     be  made before calling solve() as to ensure this sudoku
                     puzzle is solvable.
+        @param solver:  The name of the search to use when guessing
+        @type solver:   str
+        @param stats:   The statistics to fill in while solving, kept
+                        afterwards for get_stats() (None to not record
+                        anything)
+        @type stats:    SolveStats
+        @param strategies:  The names of the logical strategies to run before
+                            guessing (see sudoku.strategies.NAMES)
+        @type strategies:   Iterable[str]
+        @param cache:   The cache of solutions to look up and update (None to
+                        always solve)
+        @type cache:    SolutionCache
+        @param timeout: The number of seconds to search for (None for no
+                        limit)
+        @type timeout:  float
+        @param cancel:  The flag that stops the search once set (None for no
+                        flag)
+        @type cancel:   threading.Event
+        @return:    True = this sudoku has been solved, False = this sudoku has
+                    no solution
+        @rtype:     bool
+        @raise SolveTimeout:    The timeout passed before the search finished
+                                (this sudoku is left partly solved)
+        @raise SolveCancelled:  The cancel flag was set before the search
+                                finished (this sudoku is left partly solved)
         """
-        changing = True
-        self.set_solved(True)
-        i = 0
-        j = 0
-        while True:
-            curr_box = self.get_box(i, j)
-            # Update box and sudoku variables
-            if self.update_box(i, j):
-                changing = True
-            if not curr_box.is_solved():
-                # If any box is not solved the sudoku puzzle is not solved
+        if solver not in SOLVERS:
+            raise ValueError("Unknown solver '" + str(solver) + "'.")
+        selected = select(strategies)
+        layout = layout_of(self._cells)
+        self._paused = None
+        self._stats = stats
+        if stats is not None:
+            stats.width = layout.size
+        if cache is not None and layout.size == 9 \
+                and layout.all_options in self._cells and all(
+                    mask == layout.all_options or mask & (mask - 1) == 0
+                    for mask in self._cells):
+            puzzle = self.to_string()
+            solution = cache.get(puzzle)
+            if solution is None:
+                solved = self.solve(solver, stats, strategies, None, timeout,
+                                    cancel)
+                cache.put(puzzle, self.to_string() if solved else NO_SOLUTION)
+                return solved
+            if solution == NO_SOLUTION:
                 self.set_solved(False)
-            if curr_box.is_empty():
-                # A box has no possible value so an error has occurred
                 return False
+            self._cells = parse_grid(solution)
+            self.set_solved(True)
+            return True
+        deadline = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+        if stats is None:
+            return self._solve(solver, None, selected, deadline, cancel)
+        start = time.perf_counter()
+        try:
+            return self._solve(solver, stats, selected, deadline, cancel)
+        finally:
+            stats.seconds += time.perf_counter() - start
+
+    def _solve(self, solver: str, stats: SolveStats, strategies: (),
+               deadline: float = None, cancel=None) -> bool:
+        """
+        Operation to propagate then search with the solver given.
+        @param solver:  The name of the search to use when guessing
+        @type solver:   str
+        @param stats:   The statistics to record the solve on (None to not
+                        record anything)
+        @type stats:    SolveStats
+        @param strategies:  The (name, strategy) pairs to run before guessing
+        @type strategies:   Tuple[Tuple[str, Callable]]
+        @param deadline:    The time.monotonic() value to give up at (None for
+                            no limit)
+        @type deadline:     float
+        @param cancel:  The flag that stops the search once set (None for no
+                        flag)
+        @type cancel:   threading.Event
+        @return:    True = this sudoku has been solved, False = this sudoku has
+                    no solution
+        @rtype:     bool
+        @raise SolveTimeout:    The deadline passed
+        @raise SolveCancelled:  The cancel flag was set
+        """
+        if stats is None:
+            consistent = propagate_all(self._cells)
+        else:
+            trail = []
+            consistent = propagate_all(self._cells, trail)
+            stats.propagated(len(trail) // 2)
+        if not consistent:
+            self.set_solved(False)
+            return False
+        if solver == "clone":
+            return self._search(stats, strategies, deadline, cancel)
+        if solver == "dlx":
+            solved = (apply(self._cells, strategies, None, stats)
+                      and dlx.solve(self._cells, stats, deadline, cancel))
+        else:
+            solved = search(self._cells, [], stats, strategies, deadline,
+                            cancel)
+        self.set_solved(solved)
+        return solved
 
-            # Next box in the soduko
-            j += 1
-            if j > 8:
-                i += 1
-                j = 0
-            if i > 8:
-                i = 0
-                # Whole sudoku has been traversed and updated
-                if self.is_solved():
-                    return True
-                if not changing:
-                    # Soduko has stopped changing
-                    # Find box with least number of options
-                    best_box = self.find_fewest_option_box()
-                    # Attempt to solve with each value of the box selected
-                    for option in best_box.get_options():
-                        clone = self.copy()
-                        clone.get_box(best_box.get_x(),
-                                      best_box.get_y()).set_value(option)
-                        if clone.solve():
-                            # Clone was successful
-                            self._array = clone._array
-                            return True
-                    # No more possibilities - sudoku is invalid
-                    return False
-                # Reset states for next iteration
-                changing = False
+    def _search(self, stats: SolveStats = None, strategies: () = (),
+                deadline: float = None, cancel=None) -> bool:
+        """
+        Operation to guess values for an already propagated sudoku.
+        @param stats:   The statistics to record the search on (None to not
+                        record anything)
+        @type stats:    SolveStats
+        @param strategies:  The (name, strategy) pairs to run before guessing
+        @type strategies:   Tuple[Tuple[str, Callable]]
+        @param deadline:    The time.monotonic() value to give up at (None for
+                            no limit)
+        @type deadline:     float
+        @param cancel:  The flag that stops the search once set (None for no
+                        flag)
+        @type cancel:   threading.Event
+        @return:    True = this sudoku has been solved, False = no value of the
+                    box with the fewest options leads to a solution
+        @rtype:     bool
+        @raise SolveTimeout:    The deadline passed
+        @raise SolveCancelled:  The cancel flag was set
+        """
+        if strategies and not apply(self._cells, strategies, None, stats):
+            self.set_solved(False)
+            return False
+        best_box = self.find_fewest_option_box()
+        if best_box is Box:
+            # Every box has been solved
+            self.set_solved(True)
+            return True
+        index = best_box.get_y() * self.get_size() + best_box.get_x()
+        options = self._cells[index]
+        # Attempt to solve with each value of the box selected
+        while options:
+            bit = lowest_bit(options)
+            options &= ~bit
+            if deadline is not None and time.monotonic() > deadline:
+                raise SolveTimeout()
+            if cancel is not None and cancel.is_set():
+                raise SolveCancelled()
+            clone = self.copy()
+            if stats is None:
+                consistent = assign(clone._cells, index, bit)
+            else:
+                stats.clones += 1
+                stats.guess(index, bit.bit_length())
+                trail = []
+                consistent = assign(clone._cells, index, bit, trail)
+                stats.propagated(len(trail) // 2)
+            if consistent and clone._search(stats, strategies, deadline,
+                                            cancel):
+                # Clone was successful
+                self._cells = clone._cells
                 self.set_solved(True)
+                return True
+            if stats is not None:
+                stats.backtrack(index, bit.bit_length())
+        # No more possibilities - sudoku is invalid
+        self.set_solved(False)
+        return False
+
+    def solve_steps(self, guesses: int, stats: SolveStats = None,
+                    strategies: () = ()) -> bool:
+        """
+        Operation to solve the sudoku puzzle a few guesses at a time.
+
+        Solves as solve() does with the "trail" solver, but pauses once the
+        number of guesses given have been made. Calling again resumes the
+        paused search where it stopped (the stats and strategies given when
+        it started are kept), so many sudokus can take turns on one core.
+        @param guesses: The largest number of guesses to make before pausing
+        @type guesses:  int
+        @param stats:   The statistics to fill in while solving, kept
+                        afterwards for get_stats() (None to not record
+                        anything)
+        @type stats:    SolveStats
+        @param strategies:  The names of the logical strategies to run before
+                            guessing (see sudoku.strategies.NAMES)
+        @type strategies:   Iterable[str]
+        @return:    True = this sudoku has been solved, False = this sudoku has
+                    no solution, None = the search was paused (this sudoku is
+                    left partly solved)
+        @rtype:     bool
+        """
+        if self._paused is None:
+            selected = select(strategies)
+            self._stats = stats
+            if stats is None:
+                consistent = propagate_all(self._cells)
+            else:
+                stats.width = self.get_size()
+                trail = []
+                consistent = propagate_all(self._cells, trail)
+                stats.propagated(len(trail) // 2)
+            if not consistent:
+                self.set_solved(False)
+                return False
+            self._paused = Search(self._cells, [], stats, selected)
+        solved = self._paused.run(guesses)
+        if solved is None:
+            return None
+        self._paused = None
+        self.set_solved(solved)
+        return solved
+
+    def count_solutions(self, limit: int = 2) -> int:
+        """
+        Operation to count the solutions of this sudoku puzzle.
+
+        Uses the same search as solve() but carries on after the first
+        solution, stopping as soon as limit solutions have been found so a
+        puzzle with many solutions is not fully enumerated. This sudoku is
+        not changed.
+        @param limit:   The number of solutions to stop counting at (None to
+                        count every solution)
+        @type limit:    int
+        @return:    The number of solutions, at most limit
+        @rtype:     int
+        """
+        if limit is None:
+            limit = float("inf")
+        cells = self._cells.copy()
+        if limit < 1 or not propagate_all(cells):
+            return 0
+        return count(cells, [], limit)
+
+    def iter_solutions(self, strategies: () = ()):
+        """
+        Generator yielding every solution of this sudoku puzzle, one at a
+        time.
+
+        Each solution is found only when asked for, by carrying on the same
+        search as solve() from where it found the last one. The search
+        changes one copy of the board and undoes its changes when it
+        backtracks (see sudoku.backtrack), so memory stays flat however many
+        solutions there are and the caller can stop at any point. This
+        sudoku is not changed.
+        @param strategies:  The names of the logical strategies to run before
+                            guessing (see sudoku.strategies.NAMES)
+        @type strategies:   Iterable[str]
+        @return:    A new, solved Sudoku for each solution
+        @rtype:     Iterator[Sudoku]
+        """
+        selected = select(strategies)
+        cells = self._cells.copy()
+        if not propagate_all(cells):
+            return
+        searcher = Search(cells, [], None, selected)
+        while searcher.run():
+            solution = Sudoku._from_cells(cells.copy())
+            solution.set_solved(True)
+            yield solution
+
+    def has_unique_solution(self) -> bool:
+        """
+        Operation to check this sudoku puzzle has exactly one solution.
+        @return:    True = one solution, False = no solutions or more than one
+        @rtype:     bool
+        """
+        return self.count_solutions(2) == 1
 
     def copy(self) -> 'Sudoku':
         """
@@ -183,7 +544,9 @@ class Sudoku:
         @return:    The clone of this Sudoku instance
         @rtype:     Sudoku
         """
-        return Sudoku(self._array)
+        clone = Sudoku._from_cells(self._cells.copy())
+        clone._solved = self._solved
+        return clone
 
     def find_fewest_option_box(self) -> Box:
         """
@@ -191,51 +554,34 @@ class Sudoku:
         @return:    The Box object in the sudoku with the fewest options
         @rtype:     Box
         """
-        fewest_options = 10
-        best_box = Box
-        for i in range(0, 9, 1):
-            for j in range(0, 9, 1):
-                curr_box = self.get_box(i, j)
-                if not curr_box.is_solved() and curr_box.get_size() < fewest_options:
-                    best_box = curr_box
-                    fewest_options = best_box.get_size()
-        return best_box
+        best_index = fewest_options(self._cells)
+        if best_index < 0:
+            return Box
+        size = self.get_size()
+        return Box.view(self._cells, best_index % size, best_index // size)
 
     def is_valid(self) -> bool:
         """
         Operation for checking this sudoku instance is a valid sudoku puzzle.
 
-        Checks every column, row and 3x3 square in the current sudoku array has
-        a maximum of 1 occurrence of each integer between 1 and 9 (inclusive).
+        Checks every column, row and square in the current sudoku array has a
+        maximum of 1 occurrence of each integer between 1 and the board size
+        (inclusive).
         @return:    True = the sudoku is currently valid, False = the sudoku
                     contains a duplicate value.
         @rtype:     bool
         """
-        # Check columns are valid
-        for row in self._array:
-            check_box = Box([1, 2, 3, 4, 5, 6, 7, 8, 9], 0, 0)
-            for box in row:
-                value = box.get_value()
-                if value != "" and not check_box.remove_option(int(value)):
-                    return False
-        # Check rows are valid
-        for row in range(0, 9, 1):
-            check_box = Box([1, 2, 3, 4, 5, 6, 7, 8, 9], 0, 0)
-            for col in range(0, 9, 1):
-                value = self.get_box(row, col).get_value()
-                if value != "" and not check_box.remove_option(int(value)):
-                    return False
-        # Check 3x3 squares are valid
-        for x in range(0, 8, 3):
-            for y in range(0, 8, 3):
-                check_box = Box([1, 2, 3, 4, 5, 6, 7, 8, 9], 0, 0)
-                for i in range(x, x + 3, 1):
-                    for j in range(y, y + 3, 1):
-                        value = self.get_box(i, j).get_value()
-                        if value != "" and not check_box.remove_option(
-                                int(value)):
-                            return False
-        return True
+        return is_consistent(self._cells)
+
+    def find_conflicts(self) -> []:
+        """
+        Operation for finding exactly where this sudoku puzzle is invalid.
+        @return:    A conflict for each value repeated in a column, row or
+                    square, giving the cells holding it (empty if the sudoku
+                    is valid)
+        @rtype:     List[sudoku.validation.Conflict]
+        """
+        return find_conflicts(self._cells)
 
     def is_solved(self) -> bool:
         """
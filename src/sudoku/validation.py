@@ -0,0 +1,174 @@
+"""
+Checking sudokus for repeated values, reporting exactly where they are.
+
+A sudoku is checked in a single pass over its flat list of option masks,
+keeping one mask per unit (row, column and square, see sudoku.layout) of the
+values already seen there. Only when a value is seen twice in a unit are the
+cells of that unit looked at again to find every cell holding it, so a valid
+sudoku costs one pass and no allocation beyond the unit masks.
+"""
+from sudoku.bitmask import mask_to_value
+from sudoku.formats import parse_grid
+from sudoku.layout import layout_of
+
+KINDS = ("row", "column", "square")
+""" Tuple[str]: The name of each kind of unit, in the order of Layout.units.
+"""
+
+
+class Conflict:
+    """
+    Conflict object describing a value held by more than one cell of a unit.
+
+    Attributes:
+        _unit (int):    The unit holding the value more than once (as an index
+                        into Layout.units)
+        _value (int):   The value repeated
+        _cells (Tuple[int]):    The indexes of every cell of the unit holding
+                                the value, in row-major order
+        _size (int):    The width of the board
+    """
+    _unit = 0
+    _value = 0
+    _cells = ()
+    _size = 9
+
+    def __init__(self, unit: int, value: int, cells: (), size: int = 9):
+        """
+        Constructor for an instance of the Conflict object.
+        @param unit:    The unit holding the value more than once
+        @type unit:     int
+        @param value:   The value repeated
+        @type value:    int
+        @param cells:   The indexes of every cell of the unit holding the value
+        @type cells:    Tuple[int]
+        @param size:    The width of the board
+        @type size:     int
+        """
+        self._unit = unit
+        self._value = value
+        self._cells = tuple(cells)
+        self._size = size
+
+    def get_unit(self) -> int:
+        """
+        Getter for the unit holding the value more than once.
+        @return:    The index of the unit in Layout.units
+        @rtype:     int
+        """
+        return self._unit
+
+    def get_kind(self) -> str:
+        """
+        Getter for the kind of unit holding the value more than once.
+        @return:    "row", "column" or "square"
+        @rtype:     str
+        """
+        return KINDS[self._unit // self._size]
+
+    def get_value(self) -> int:
+        """
+        Getter for the value repeated.
+        @return:    The value
+        @rtype:     int
+        """
+        return self._value
+
+    def get_cells(self) -> ():
+        """
+        Getter for the cells holding the value.
+        @return:    The indexes of the cells, in row-major order
+        @rtype:     Tuple[int]
+        """
+        return self._cells
+
+    def get_coordinates(self) -> []:
+        """
+        Getter for the coordinates of the cells holding the value.
+        @return:    The (x, y) coordinates of the cells, in row-major order
+        @rtype:     List[Tuple[int]]
+        """
+        return [(index % self._size, index // self._size)
+                for index in self._cells]
+
+    def __repr__(self) -> str:
+        """
+        Operation to describe this conflict for debugging.
+        @return:    The kind and number of the unit, the value and the
+                    coordinates of the cells
+        @rtype:     str
+        """
+        return "Conflict(" + self.get_kind() + " " \
+            + str(self._unit % self._size) + ", value " + str(self._value) \
+            + ", cells " + str(self.get_coordinates()) + ")"
+
+
+def find_conflicts(cells: []) -> []:
+    """
+    Function to find every value repeated within a unit of a sudoku.
+
+    Cells with more than one option (or none) are not values, so are
+    ignored.
+    @param cells:   The flat list of option masks
+    @type cells:    array[int]
+    @return:    A conflict for each unit and value held more than once,
+                ordered by unit then value (empty if the sudoku is valid)
+    @rtype:     List[Conflict]
+    @raise ValueError:  The number of cells is not a supported board size
+    """
+    layout = layout_of(cells)
+    cell_units = layout.cell_units
+    seen = [0] * len(layout.units)
+    repeated = {}
+    for index in range(0, layout.cells, 1):
+        mask = cells[index]
+        if mask == 0 or mask & (mask - 1):
+            continue
+        for unit in cell_units[index]:
+            if seen[unit] & mask:
+                repeated[unit] = repeated.get(unit, 0) | mask
+            else:
+                seen[unit] |= mask
+    conflicts = []
+    for unit in sorted(repeated):
+        masks = repeated[unit]
+        while masks:
+            mask = masks & -masks
+            masks &= ~mask
+            conflicts.append(Conflict(
+                unit, mask_to_value(mask),
+                [index for index in layout.units[unit]
+                 if cells[index] == mask],
+                layout.size))
+    return conflicts
+
+
+def conflicting_cells(conflicts: []) -> []:
+    """
+    Function to list every cell involved in any of the conflicts given.
+    @param conflicts:   The conflicts found (see find_conflicts())
+    @type conflicts:    Iterable[Conflict]
+    @return:    The indexes of the cells, sorted and without repeats
+    @rtype:     List[int]
+    """
+    return sorted({index for conflict in conflicts
+                   for index in conflict.get_cells()})
+
+
+def validate_many(puzzles):
+    """
+    Generator checking a batch of puzzles given as strings.
+    @param puzzles: The puzzles to check, one character per cell (see
+                    sudoku.formats)
+    @type puzzles:  Iterable[str]
+    @return:    The conflicts of each puzzle in turn (see find_conflicts(),
+                empty if it is valid), or None for a malformed puzzle
+    @rtype:     Iterator[List[Conflict]]
+    """
+    for puzzle in puzzles:
+        try:
+            cells = parse_grid(puzzle)
+        except ValueError:
+            yield None
+            continue
+        yield find_conflicts(cells)
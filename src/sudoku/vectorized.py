@@ -0,0 +1,182 @@
+"""
+Batch constraint propagation of many sudokus at once with NumPy.
+
+N sudokus are held as an (N, 81) uint16 array of option masks (see
+sudoku.bitmask) and naked and hidden singles are eliminated across every
+board together using reductions over precomputed unit index arrays. Most
+easy to medium puzzles are solved by this alone; any board still unsolved
+afterwards is handed to the scalar backtracking search (see
+sudoku.backtrack).
+
+Only 9x9 boards are batched, since their masks fit the uint16 arrays used;
+other sizes are reported as malformed. NumPy is an optional dependency, only
+needed by this module.
+"""
+from sudoku.backtrack import search
+from sudoku.bitmask import ALL_OPTIONS
+from sudoku.propagation import CELL_UNITS, UNITS, propagate_all
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if np is not None:
+    _UNITS = np.array(UNITS, dtype=np.intp)
+    """ ndarray:    (27, 9) cell indexes of every row, column and 3x3 square.
+    """
+    _CELL_UNITS = np.array(CELL_UNITS, dtype=np.intp)
+    """ ndarray:    (81, 3) units each cell belongs to.
+    """
+    _POPCOUNT = np.array([bin(mask).count("1")
+                          for mask in range(ALL_OPTIONS + 1)], dtype=np.uint8)
+    """ ndarray:    Number of options in each 9 bit mask.
+    """
+    _BYTE_TO_MASK = np.zeros(256, dtype=np.uint16)
+    """ ndarray:    Option mask of each puzzle byte (0 for invalid bytes).
+    """
+    _BYTE_TO_MASK[ord(".")] = ALL_OPTIONS
+    _BYTE_TO_MASK[ord("0")] = ALL_OPTIONS
+    for _value in range(1, 10, 1):
+        _BYTE_TO_MASK[ord(str(_value))] = 1 << (_value - 1)
+    _MASK_TO_BYTE = np.full(ALL_OPTIONS + 1, ord("."), dtype=np.uint8)
+    """ ndarray:    Byte written for each mask ('.' unless solved).
+    """
+    for _value in range(1, 10, 1):
+        _MASK_TO_BYTE[1 << (_value - 1)] = ord(str(_value))
+
+
+def _require_numpy():
+    """
+    Function to check NumPy can be used.
+    @raise ImportError: NumPy is not installed
+    """
+    if np is None:
+        raise ImportError("NumPy is required for batch propagation, install "
+                          "it with 'pip install numpy'.")
+
+
+def to_array(puzzles: []):
+    """
+    Function to read many 81 character puzzles into an array of masks.
+
+    Malformed puzzles (wrong length or invalid characters) are given a row of
+    zero masks, which propagate_batch() reports as invalid.
+    @param puzzles: The puzzles to read (see sudoku.formats)
+    @type puzzles:  List[str]
+    @return:    The (N, 81) uint16 array of option masks
+    @rtype:     numpy.ndarray
+    """
+    _require_numpy()
+    masks = np.zeros((len(puzzles), 81), dtype=np.uint16)
+    for row, puzzle in enumerate(puzzles):
+        data = puzzle.strip().encode("ascii", "replace")
+        if len(data) == 81:
+            cells = _BYTE_TO_MASK[np.frombuffer(data, dtype=np.uint8)]
+            if cells.all():
+                masks[row] = cells
+    return masks
+
+
+def to_strings(masks) -> []:
+    """
+    Function to write an array of masks as 81 character strings.
+    @param masks:   The (N, 81) array of option masks
+    @type masks:    numpy.ndarray
+    @return:    The digit of every solved cell, '.' for unsolved cells
+    @rtype:     List[str]
+    """
+    _require_numpy()
+    data = _MASK_TO_BYTE[masks].tobytes().decode("ascii")
+    return [data[row * 81:row * 81 + 81] for row in range(0, len(masks), 1)]
+
+
+def _propagate_once(masks):
+    """
+    Function to apply one round of naked and hidden single elimination.
+    @param masks:   The (N, 81) array of option masks to propagate
+    @type masks:    numpy.ndarray
+    @return:    The propagated masks and a boolean array of the boards found
+                to contain a contradiction
+    @rtype:     Tuple[numpy.ndarray, numpy.ndarray]
+    """
+    solved = (masks & (masks - 1)) == 0
+    solved_values = np.where(solved, masks, 0)
+
+    # Naked singles - remove every solved value from the rest of its units
+    by_unit = solved_values[:, _UNITS]
+    unit_solved = np.bitwise_or.reduce(by_unit, axis=2)
+    duplicated = (_POPCOUNT[by_unit].sum(axis=2, dtype=np.int32)
+                  != _POPCOUNT[unit_solved])
+    peers_solved = np.bitwise_or.reduce(unit_solved[:, _CELL_UNITS], axis=2)
+    masks = np.where(solved, masks, masks & ~peers_solved)
+
+    # Hidden singles - values that only one cell of a unit can still take
+    by_unit = masks[:, _UNITS]
+    once = np.zeros(unit_solved.shape, dtype=np.uint16)
+    twice = np.zeros(unit_solved.shape, dtype=np.uint16)
+    for position in range(0, 9, 1):
+        twice |= once & by_unit[:, :, position]
+        once |= by_unit[:, :, position]
+    missing = once != ALL_OPTIONS
+    hidden = once & ~twice
+    cell_hidden = np.bitwise_or.reduce(
+        masks[:, :, None] & hidden[:, _CELL_UNITS], axis=2)
+    overfull = (cell_hidden & (cell_hidden - 1)) != 0
+    masks = np.where(cell_hidden != 0, cell_hidden, masks)
+
+    invalid = (duplicated.any(axis=1) | missing.any(axis=1)
+               | overfull.any(axis=1) | (masks == 0).any(axis=1))
+    return masks, invalid
+
+
+def propagate_batch(masks):
+    """
+    Function to propagate naked and hidden singles across many sudokus.
+
+    Rounds of elimination are applied to every board that is still changing
+    until none do.
+    @param masks:   The (N, 81) array of option masks (not changed)
+    @type masks:    numpy.ndarray
+    @return:    The propagated masks, and a boolean array of the boards that
+                contain a contradiction (and so have no solution)
+    @rtype:     Tuple[numpy.ndarray, numpy.ndarray]
+    """
+    _require_numpy()
+    masks = np.array(masks, dtype=np.uint16)
+    invalid = (masks == 0).any(axis=1)
+    active = np.flatnonzero(~invalid)
+    while len(active):
+        before = masks[active]
+        after, contradiction = _propagate_once(before)
+        masks[active] = after
+        invalid[active] |= contradiction
+        changed = (after != before).any(axis=1) & ~contradiction
+        active = active[changed]
+    return masks, invalid
+
+
+def solve_batch(puzzles: []) -> []:
+    """
+    Function to solve many sudokus given as 81 character strings.
+
+    Every puzzle is propagated together, then those left unsolved are
+    finished one at a time by the scalar backtracking search.
+    @param puzzles: The puzzles to solve (see sudoku.formats)
+    @type puzzles:  List[str]
+    @return:    The solution of each puzzle, in the same order (None if the
+                puzzle is malformed, invalid or has no solution)
+    @rtype:     List[str]
+    """
+    masks, invalid = propagate_batch(to_array(puzzles))
+    solutions = to_strings(masks)
+    unsolved = ((masks & (masks - 1)) != 0).any(axis=1) & ~invalid
+    for row in np.flatnonzero(unsolved):
+        cells = masks[row].tolist()
+        if propagate_all(cells) and search(cells, []):
+            solutions[row] = to_strings(np.array([cells], dtype=np.uint16))[0]
+        else:
+            invalid[row] = True
+    for row in np.flatnonzero(invalid):
+        solutions[row] = None
+    return solutions